@@ -208,14 +208,9 @@ Respond with ONLY the corrected city name, nothing else."""
         Returns:
             The filename where the data was saved
         """
-        # Build filename
-        filename_parts = [city_name]
-        if province:
-            filename_parts.append(province)
-        if country:
-            filename_parts.append(country)
-
-        filename = "_".join(filename_parts) + ".json"
+        # Build filename from the city name and any provided location qualifiers
+        qualifiers = "".join(f"_{part}" for part in (province, country) if part)
+        filename = f"{city_name}{qualifiers}.json"
 
         try:
             with open(filename, 'w', encoding='utf-8') as f:
@@ -242,14 +237,17 @@ Respond with ONLY the corrected city name, nothing else."""
             print("\n❌ No data received from API")
             return
 
-        print("\n" + "=" * 70)
-        print(f"City Search: {city_name}")
-        print("=" * 70)
+        lines = [
+            "\n" + "=" * 70,
+            f"City Search: {city_name}",
+            "=" * 70,
+        ]
 
         cities = data.get("cities", [])
 
         if not cities:
-            print("\n❌ No cities found")
+            lines.append("\n❌ No cities found")
+            sys.stdout.write("\n".join(lines) + "\n")
             return
 
         def is_empty(value):
@@ -259,103 +257,105 @@ Respond with ONLY the corrected city name, nothing else."""
         # Display information for each city
         for idx, city in enumerate(cities, 1):
             if len(cities) > 1:
-                print(f"\n{'─' * 70}")
-                print(f"City {idx}: {city.get('city_name', 'N/A')}")
-                print(f"{'─' * 70}")
+                lines.append(f"\n{'─' * 70}")
+                lines.append(f"City {idx}: {city.get('city_name', 'N/A')}")
+                lines.append(f"{'─' * 70}")
 
             # Display Local Name
             if not is_empty(city.get("local_name")):
-                print("\n🗣️  Local Name:")
-                print(city.get("local_name"))
+                lines.append("\n🗣️  Local Name:")
+                lines.append(str(city.get("local_name")))
 
             # Display Nickname
             if not is_empty(city.get("nickname")):
-                print("\n🏷️  Nickname:")
-                print(city.get("nickname"))
+                lines.append("\n🏷️  Nickname:")
+                lines.append(str(city.get("nickname")))
 
             # Display Old Names
             if not is_empty(city.get("old_names")):
-                print("\n📜 Old Names:")
-                print(city.get("old_names"))
+                lines.append("\n📜 Old Names:")
+                lines.append(str(city.get("old_names")))
 
             # Display Etymology
             if not is_empty(city.get("etymology")):
-                print("\n📖 Etymology:")
-                print(city.get("etymology"))
+                lines.append("\n📖 Etymology:")
+                lines.append(str(city.get("etymology")))
 
             # Display History
             if not is_empty(city.get("history")):
-                print("\n📚 History:")
-                print(city.get("history"))
+                lines.append("\n📚 History:")
+                lines.append(str(city.get("history")))
 
             # Display Province and Country
             if not is_empty(city.get("province_and_country")):
-                print("\n🗺️  Province & Country:")
-                print(city.get("province_and_country"))
+                lines.append("\n🗺️  Province & Country:")
+                lines.append(str(city.get("province_and_country")))
 
             # Display Coordinates
             latitude = city.get("latitude")
             longitude = city.get("longitude")
             if not is_empty(latitude) or not is_empty(longitude):
-                print("\n📍 Coordinates:")
+                lines.append("\n📍 Coordinates:")
                 if not is_empty(latitude):
-                    print(f"  Latitude:  {latitude}")
+                    lines.append(f"  Latitude:  {latitude}")
                 if not is_empty(longitude):
-                    print(f"  Longitude: {longitude}")
+                    lines.append(f"  Longitude: {longitude}")
 
             # Display Area
             if not is_empty(city.get("area")):
-                print("\n📐 Area:")
-                print(city.get("area"))
+                lines.append("\n📐 Area:")
+                lines.append(str(city.get("area")))
 
             # Display Elevation
             if not is_empty(city.get("elevation")):
-                print("\n⛰️  Elevation:")
-                print(city.get("elevation"))
+                lines.append("\n⛰️  Elevation:")
+                lines.append(str(city.get("elevation")))
 
             # Display Geography
             if not is_empty(city.get("geography")):
-                print("\n🏔️  Geography:")
-                print(city.get("geography"))
+                lines.append("\n🏔️  Geography:")
+                lines.append(str(city.get("geography")))
 
             # Display Climate
             if not is_empty(city.get("climate")):
-                print("\n🌤️  Climate:")
-                print(city.get("climate"))
+                lines.append("\n🌤️  Climate:")
+                lines.append(str(city.get("climate")))
 
             # Display Demographics
             if not is_empty(city.get("demographics")):
-                print("\n👥 Demographics:")
-                print(city.get("demographics"))
+                lines.append("\n👥 Demographics:")
+                lines.append(str(city.get("demographics")))
 
             # Display Time Zone
             if not is_empty(city.get("time_zone")):
-                print("\n🕐 Time Zone:")
-                print(city.get("time_zone"))
+                lines.append("\n🕐 Time Zone:")
+                lines.append(str(city.get("time_zone")))
 
             # Display Telephone Code
             if not is_empty(city.get("telephone_code")):
-                print("\n☎️  Telephone Code:")
-                print(city.get("telephone_code"))
+                lines.append("\n☎️  Telephone Code:")
+                lines.append(str(city.get("telephone_code")))
 
             # Display Country Code
             if not is_empty(city.get("country_code")):
-                print("\n🏳️  Country Code:")
-                print(city.get("country_code"))
+                lines.append("\n🏳️  Country Code:")
+                lines.append(str(city.get("country_code")))
 
             # Display Tourist Attractions
             if not is_empty(city.get("tourist_attractions")):
-                print("\n🎭 Tourist Attractions:")
-                print(city.get("tourist_attractions"))
+                lines.append("\n🎭 Tourist Attractions:")
+                lines.append(str(city.get("tourist_attractions")))
 
             # Display How to Reach
             if not is_empty(city.get("how_to_reach")):
-                print("\n🚗 How to Reach:")
-                print(city.get("how_to_reach"))
+                lines.append("\n🚗 How to Reach:")
+                lines.append(str(city.get("how_to_reach")))
 
+        sys.stdout.write("\n".join(lines) + "\n")
 
-def main():
-    """Main entry point for the command-line application."""
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create and configure the argument parser."""
     parser = argparse.ArgumentParser(
         description="City Information Application - Get information about cities using Perplexity API",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -406,7 +406,12 @@ Examples:
         help="Enable verbose logging"
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """Main entry point for the command-line application."""
+    args = create_parser().parse_args()
 
     # Set logging level
     if args.verbose:
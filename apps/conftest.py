@@ -0,0 +1,9 @@
+"""Shared pytest configuration for the apps test suite."""
+
+import sys
+from pathlib import Path
+
+# Add tangle module to path for imports, once per test session
+TANGLE_DIR = str(Path(__file__).parent.parent / "tangle")
+if TANGLE_DIR not in sys.path:
+    sys.path.insert(0, TANGLE_DIR)
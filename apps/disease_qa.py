@@ -7,6 +7,7 @@ Queries disease information and displays results in the terminal
 import sys
 import json
 import argparse
+import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
@@ -124,8 +125,8 @@ def display_results(question: str, data: Optional[Dict[str, Any]]) -> None:
     print("\n" + "=" * 70 + "\n")
 
 
-def main():
-    """Main entry point for the command-line application."""
+def create_parser() -> argparse.ArgumentParser:
+    """Create and configure the argument parser."""
     parser = argparse.ArgumentParser(
         description="Disease Q&A Application - Query disease information using Perplexity API",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -154,7 +155,12 @@ Examples:
         help="Enable verbose logging"
     )
 
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """Main entry point for the command-line application."""
+    args = create_parser().parse_args()
 
     # Set logging level
     if args.verbose:
@@ -14,6 +14,13 @@ from logging_utils import setup_logging
 
 logger = setup_logging("drugbank_medicine.log")
 
+# User prompt for a structured MedicineInfo lookup
+MEDICINE_PROMPT_TEMPLATE = (
+    "Provide comprehensive pharmaceutical information about {medicine_name}. "
+    "Include drug type, approval status, chemical properties, indications, "
+    "pharmacodynamics, side effects, dosage forms, and any relevant clinical data."
+)
+
 
 class DrugType(str, Enum):
     """Types of drugs"""
@@ -323,7 +330,7 @@ if __name__ == "__main__":
 
     # Create input with the medicine query and response model
     model_input = ModelInput(
-        user_prompt=f"Provide comprehensive pharmaceutical information about {medicine_name}. Include drug type, approval status, chemical properties, indications, pharmacodynamics, side effects, dosage forms, and any relevant clinical data.",
+        user_prompt=MEDICINE_PROMPT_TEMPLATE.format(medicine_name=medicine_name),
         response_model=MedicineInfo
     )
 
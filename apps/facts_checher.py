@@ -22,6 +22,9 @@ from logging_utils import setup_logging
 
 logger = setup_logging("facts_checker.log")
 
+SEPARATOR = "=" * 70
+SUBSEPARATOR = "-" * 70
+
 
 class Claim(BaseModel):
     """Model for representing a single claim and its fact check."""
@@ -119,27 +122,29 @@ def display_results(text: str, data: Optional[Dict[str, Any]], format_json: bool
         print(json.dumps(data, indent=2))
         return
 
-    print("\n" + "=" * 70)
-    print("FACT CHECK RESULTS")
-    print("=" * 70)
+    lines = [
+        "\n" + SEPARATOR,
+        "FACT CHECK RESULTS",
+        SEPARATOR,
+    ]
 
     # Display Overall Rating
     overall_rating = data.get("overall_rating", "UNKNOWN")
     rating_emoji = "🟢" if overall_rating == "MOSTLY_TRUE" else "🟠" if overall_rating == "MIXED" else "🔴"
-    print(f"\n{rating_emoji} OVERALL RATING: {overall_rating}")
+    lines.append(f"\n{rating_emoji} OVERALL RATING: {overall_rating}")
 
     # Display Summary
     summary = data.get("summary", "N/A")
     if summary:
-        print("\n📝 SUMMARY:")
-        print("-" * 70)
-        print(summary)
+        lines.append("\n📝 SUMMARY:")
+        lines.append(SUBSEPARATOR)
+        lines.append(str(summary))
 
     # Display Claims Analysis
     claims = data.get("claims", [])
     if claims:
-        print("\n🔍 CLAIMS ANALYSIS:")
-        print("-" * 70)
+        lines.append("\n🔍 CLAIMS ANALYSIS:")
+        lines.append(SUBSEPARATOR)
         for i, claim in enumerate(claims, 1):
             rating = claim.get("rating", "UNKNOWN")
             if rating == "TRUE":
@@ -153,25 +158,24 @@ def display_results(text: str, data: Optional[Dict[str, Any]], format_json: bool
             else:
                 rating_emoji = "🔄"
 
-            print(f"\nClaim {i}: {rating_emoji} {rating}")
-            print(f"  Statement: \"{claim.get('claim', 'N/A')}\"")
-            print(f"  Explanation: {claim.get('explanation', 'N/A')}")
+            lines.append(f"\nClaim {i}: {rating_emoji} {rating}")
+            lines.append(f"  Statement: \"{claim.get('claim', 'N/A')}\"")
+            lines.append(f"  Explanation: {claim.get('explanation', 'N/A')}")
 
             sources = claim.get("sources", [])
             if sources:
-                print(f"  Sources:")
-                for source in sources:
-                    print(f"    - {source}")
+                lines.append("  Sources:")
+                lines.extend(f"    - {source}" for source in sources)
 
     # Display Citations
     citations = data.get("citations", [])
     if citations:
-        print("\n📚 CITATIONS:")
-        print("-" * 70)
-        for i, citation in enumerate(citations, 1):
-            print(f"  {i}. {citation}")
+        lines.append("\n📚 CITATIONS:")
+        lines.append(SUBSEPARATOR)
+        lines.extend(f"  {i}. {citation}" for i, citation in enumerate(citations, 1))
 
-    print("\n" + "=" * 70 + "\n")
+    lines.append(f"\n{SEPARATOR}\n")
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -17,7 +17,7 @@ from logging_utils import setup_logging
 logger = setup_logging("medicine_lookup.log")
 
 from drugbank_medicine import (
-    MedicineInfo, ChemicalProperties, Pharmacodynamics, Pharmacokinetics,
+    MEDICINE_PROMPT_TEMPLATE, MedicineInfo, ChemicalProperties, Pharmacodynamics, Pharmacokinetics,
     DrugType, DrugGroup, RouteOfAdministration, ATCCode, Target, Enzyme,
     Interaction, FoodInteraction, Dosage, ExternalIdentifier, AdverseReaction,
     Contraindication, Manufacturer, Patent, ClinicalTrial, Taxonomy, Carrier, Transporter
@@ -67,7 +67,7 @@ class MedicineLookupService:
 
         # Create model input with structured output
         model_input = ModelInput(
-            user_prompt=f"Provide comprehensive pharmaceutical information about {medicine_name}. Include drug type, approval status, chemical properties, indications, pharmacodynamics, side effects, dosage forms, and any relevant clinical data.",
+            user_prompt=MEDICINE_PROMPT_TEMPLATE.format(medicine_name=medicine_name),
             response_model=MedicineInfo
         )
 
@@ -31,6 +31,24 @@ class PaperReview(BaseModel):
     overall_rating: str
 
 
+# Display order and headings for PaperReview fields
+PAPER_REVIEW_SECTIONS = (
+    ("title", "📌 TITLE"),
+    ("author", "👤 AUTHOR"),
+    ("abstract", "📝 ABSTRACT"),
+    ("key_contribution", "💡 KEY CONTRIBUTION"),
+    ("hypothesis", "🔮 HYPOTHESIS"),
+    ("claims", "📢 CLAIMS"),
+    ("verifications", "✅ VERIFICATIONS"),
+    ("methodology", "🔬 METHODOLOGY"),
+    ("results", "📊 RESULTS"),
+    ("limitations", "⚠️  LIMITATIONS"),
+    ("strengths", "✨ STRENGTHS"),
+    ("weaknesses", "❌ WEAKNESSES"),
+    ("overall_rating", "⭐ OVERALL RATING"),
+)
+
+
 class PaperReviewer:
     """Reviews academic papers using Perplexity AI with PDF analysis."""
 
@@ -120,57 +138,10 @@ class PaperReviewer:
             print("📄 PAPER ANALYSIS REPORT")
             print("=" * 80 + "\n")
 
-            if "title" in data:
-                print(f"📌 TITLE")
-                print(f"   {data['title']}\n")
-
-            if "author" in data:
-                print(f"👤 AUTHOR")
-                print(f"   {data['author']}\n")
-
-            if "abstract" in data:
-                print(f"📝 ABSTRACT")
-                print(f"   {data['abstract']}\n")
-
-            if "key_contribution" in data:
-                print(f"💡 KEY CONTRIBUTION")
-                print(f"   {data['key_contribution']}\n")
-
-            if "hypothesis" in data:
-                print(f"🔮 HYPOTHESIS")
-                print(f"   {data['hypothesis']}\n")
-
-            if "claims" in data:
-                print(f"📢 CLAIMS")
-                print(f"   {data['claims']}\n")
-
-            if "verifications" in data:
-                print(f"✅ VERIFICATIONS")
-                print(f"   {data['verifications']}\n")
-
-            if "methodology" in data:
-                print(f"🔬 METHODOLOGY")
-                print(f"   {data['methodology']}\n")
-
-            if "results" in data:
-                print(f"📊 RESULTS")
-                print(f"   {data['results']}\n")
-
-            if "limitations" in data:
-                print(f"⚠️  LIMITATIONS")
-                print(f"   {data['limitations']}\n")
-
-            if "strengths" in data:
-                print(f"✨ STRENGTHS")
-                print(f"   {data['strengths']}\n")
-
-            if "weaknesses" in data:
-                print(f"❌ WEAKNESSES")
-                print(f"   {data['weaknesses']}\n")
-
-            if "overall_rating" in data:
-                print(f"⭐ OVERALL RATING")
-                print(f"   {data['overall_rating']}\n")
+            for key, heading in PAPER_REVIEW_SECTIONS:
+                if key in data:
+                    print(heading)
+                    print(f"   {data[key]}\n")
 
             print("=" * 80)
         except json.JSONDecodeError:
@@ -17,6 +17,9 @@ from logging_utils import setup_logging
 
 logger = setup_logging("perplx_client_cli.log")
 
+SEPARATOR = "=" * 80
+RESPONSE_TEMPLATE = f"\n{SEPARATOR}\nRESPONSE\n{SEPARATOR}\n{{response}}\n{SEPARATOR}\n\n"
+
 
 class PerplexityCLI:
     """Command-line interface for Perplexity AI."""
@@ -121,11 +124,7 @@ class PerplexityCLI:
             response: Response text from the API
             save_file: Optional file path to save the response
         """
-        print("\n" + "=" * 80)
-        print("RESPONSE")
-        print("=" * 80)
-        print(response)
-        print("=" * 80 + "\n")
+        sys.stdout.write(RESPONSE_TEMPLATE.format(response=response))
 
         if save_file:
             try:
@@ -7,6 +7,7 @@ Researches topics and displays results in the terminal
 import sys
 import json
 import argparse
+import dataclasses
 from pathlib import Path
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
@@ -20,6 +21,19 @@ from logging_utils import setup_logging
 
 logger = setup_logging("research_finder.log")
 
+SEPARATOR = "=" * 70
+SUBSEPARATOR = "-" * 70
+
+# Shared per-query config; only the model varies between calls
+RESEARCH_CONFIG = ModelConfig(
+    model="sonar-pro",
+    max_tokens=1024,
+    temperature=0.7,
+    top_p=0.9,
+    stream=False,
+    search_mode="web"
+)
+
 
 class ResearchResponse(BaseModel):
     """Structured response for research findings."""
@@ -61,14 +75,7 @@ def research_topic(query: str, client: PerplexityClient, model: str = "sonar-pro
             response_model=ResearchResponse
         )
 
-        config = ModelConfig(
-            model=model,
-            max_tokens=1024,
-            temperature=0.7,
-            top_p=0.9,
-            stream=False,
-            search_mode="web"
-        )
+        config = dataclasses.replace(RESEARCH_CONFIG, model=model)
 
         response = client.generate_content(model_input, config)
 
@@ -100,26 +107,27 @@ def display_results(query: str, data: Optional[Dict[str, Any]]) -> None:
         print("\n❌ No data received from API")
         return
 
-    print("\n" + "=" * 70)
-    print(f"Query: {query}")
-    print("=" * 70)
-
-    # Display Summary
-    print("\n📝 SUMMARY:")
-    print("-" * 70)
-    print(data.get("summary", "N/A"))
+    lines = [
+        "",
+        SEPARATOR,
+        f"Query: {query}",
+        SEPARATOR,
+        "",
+        "📝 SUMMARY:",
+        SUBSEPARATOR,
+        str(data.get("summary", "N/A")),
+    ]
 
     # Display Sources
     sources = data.get("sources", [])
     if sources:
-        print("\n🔗 SOURCES:")
-        print("-" * 70)
-        for i, source in enumerate(sources, 1):
-            print(f"  {i}. {source}")
+        lines.extend(["", "🔗 SOURCES:", SUBSEPARATOR])
+        lines.extend(f"  {i}. {source}" for i, source in enumerate(sources, 1))
     else:
-        print("\n🔗 SOURCES: No sources were explicitly listed or extracted.")
+        lines.extend(["", "🔗 SOURCES: No sources were explicitly listed or extracted."])
 
-    print("\n" + "=" * 70 + "\n")
+    lines.extend(["", SEPARATOR, "", ""])
+    sys.stdout.write("\n".join(lines))
 
 
 def main():
@@ -1,31 +1,81 @@
 """Tests for the disease_qa.py module."""
 
-import sys
-import json
+import importlib
 import pytest
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-from pydantic import BaseModel
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
 
-# Add tangle module to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent / "tangle"))
 
-from disease_qa import (
-    DiseaseResponse,
-    ApiError,
-    ask_disease_question,
-    display_results,
-    main
-)
-from config import ModelConfig, ModelInput
+@dataclass
+class _FakeJson:
+    """Stand-in for a parsed response model exposing only model_dump()."""
+    data: Dict[str, Any]
+
+    def model_dump(self) -> Dict[str, Any]:
+        return self.data
+
+
+@dataclass
+class _FakeResponse:
+    """Stand-in for ModelOutput with the attributes disease_qa reads."""
+    json: Optional[_FakeJson] = None
+    text: Optional[str] = None
+
+
+@dataclass
+class _FakeClient:
+    """Stand-in for PerplexityClient that records generate_content calls."""
+    response: Optional[_FakeResponse] = None
+    error: Optional[Exception] = None
+    calls: List[tuple] = field(default_factory=list)
+
+    def generate_content(self, model_input, config=None, search_filter=None):
+        self.calls.append((model_input, config))
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+@pytest.fixture(scope="session")
+def disease_qa_module():
+    """The disease_qa module, imported once per session (path set in conftest)."""
+    return importlib.import_module("disease_qa")
+
+
+@pytest.fixture(scope="module")
+def diabetes_payload():
+    """Structured response payload for a diabetes question."""
+    return {
+        "overview": "Diabetes is a chronic disease",
+        "causes": "Insulin resistance",
+        "treatments": "Medication and diet",
+        "citations": ["https://example.com/1"]
+    }
+
+
+@pytest.fixture(scope="module")
+def minimal_payload():
+    """Structured response payload without citations."""
+    return {
+        "overview": "Test",
+        "causes": "Test",
+        "treatments": "Test"
+    }
+
+
+@pytest.fixture
+def fake_client():
+    """Fresh PerplexityClient stand-in with no canned response."""
+    return _FakeClient()
 
 
 class TestDiseaseResponse:
     """Test the DiseaseResponse Pydantic model."""
 
-    def test_disease_response_valid(self):
+    def test_disease_response_valid(self, disease_qa_module):
         """Test creating a valid DiseaseResponse."""
-        response = DiseaseResponse(
+        response = disease_qa_module.DiseaseResponse(
             overview="Diabetes is a metabolic disorder",
             causes="High blood sugar levels",
             treatments="Insulin therapy",
@@ -36,205 +86,117 @@ class TestDiseaseResponse:
         assert response.treatments == "Insulin therapy"
         assert len(response.citations) == 2
 
-    def test_disease_response_empty_citations(self):
+    def test_disease_response_empty_citations(self, disease_qa_module):
         """Test DiseaseResponse with empty citations."""
-        response = DiseaseResponse(
+        response = disease_qa_module.DiseaseResponse(
             overview="Overview",
             causes="Causes",
             treatments="Treatments"
         )
         assert response.citations == []
 
-    def test_disease_response_missing_fields(self):
+    def test_disease_response_missing_fields(self, disease_qa_module):
         """Test DiseaseResponse validation with missing required fields."""
         with pytest.raises(Exception):  # Pydantic validation error
-            DiseaseResponse(overview="Overview")
+            disease_qa_module.DiseaseResponse(overview="Overview")
 
 
 class TestApiError:
     """Test the ApiError exception."""
 
-    def test_api_error_creation(self):
+    def test_api_error_creation(self, disease_qa_module):
         """Test creating an ApiError."""
-        error = ApiError("Test error message")
+        error = disease_qa_module.ApiError("Test error message")
         assert str(error) == "Test error message"
 
-    def test_api_error_is_exception(self):
+    def test_api_error_is_exception(self, disease_qa_module):
         """Test that ApiError is an Exception."""
-        error = ApiError("Test")
+        error = disease_qa_module.ApiError("Test")
         assert isinstance(error, Exception)
 
 
 class TestAskDiseaseQuestion:
     """Test the ask_disease_question function."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.mock_client = MagicMock()
-
-    def test_ask_disease_question_success_json(self):
-        """Test successful API response with JSON content."""
-        response_data = {
-            "overview": "Diabetes is a chronic disease",
-            "causes": "Insulin resistance",
-            "treatments": "Medication and diet",
-            "citations": ["https://example.com/1"]
-        }
-
-        mock_response = MagicMock()
-        mock_json = MagicMock()
-        mock_json.model_dump.return_value = response_data
-        mock_response.json = mock_json
-        mock_response.text = None
-
-        self.mock_client.generate_content.return_value = mock_response
-
-        result = ask_disease_question("What is diabetes?", self.mock_client, "sonar-pro")
-
-        assert result is not None
-        assert result["overview"] == "Diabetes is a chronic disease"
-        assert result["causes"] == "Insulin resistance"
-        assert result["treatments"] == "Medication and diet"
-        assert len(result["citations"]) == 1
+    @pytest.mark.parametrize("model,expected_model", [
+        (None, "sonar-pro"),
+        ("sonar", "sonar"),
+        ("sonar-pro", "sonar-pro"),
+    ])
+    def test_ask_disease_question_variants(self, model, expected_model, fake_client, diabetes_payload, disease_qa_module):
+        """Test successful responses, model selection and system prompt."""
+        fake_client.response = _FakeResponse(json=_FakeJson(diabetes_payload))
+
+        if model is None:
+            result = disease_qa_module.ask_disease_question("What is diabetes?", fake_client)
+        else:
+            result = disease_qa_module.ask_disease_question("What is diabetes?", fake_client, model=model)
+
+        assert result == diabetes_payload
+        assert len(fake_client.calls) == 1
+
+        model_input, config = fake_client.calls[0]
+        assert isinstance(model_input, disease_qa_module.ModelInput)
+        assert "medical assistant" in model_input.system_prompt.lower()
+        assert config.model == expected_model
 
-    def test_ask_disease_question_no_json_response(self):
+    def test_ask_disease_question_no_json_response(self, fake_client, disease_qa_module):
         """Test API response with no structured output."""
-        mock_response = MagicMock()
-        mock_response.json = None
+        fake_client.response = _FakeResponse(json=None)
 
-        self.mock_client.generate_content.return_value = mock_response
-
-        result = ask_disease_question("What is diabetes?", self.mock_client)
+        result = disease_qa_module.ask_disease_question("What is diabetes?", fake_client)
 
         assert result is None
 
-    def test_ask_disease_question_api_error(self):
+    def test_ask_disease_question_api_error(self, fake_client, disease_qa_module):
         """Test handling of API errors."""
-        self.mock_client.generate_content.side_effect = Exception("API request failed")
+        fake_client.error = Exception("API request failed")
 
-        with pytest.raises(ApiError) as exc_info:
-            ask_disease_question("What is diabetes?", self.mock_client)
+        with pytest.raises(disease_qa_module.ApiError) as exc_info:
+            disease_qa_module.ask_disease_question("What is diabetes?", fake_client)
 
         assert "Error querying Perplexity API" in str(exc_info.value)
 
-    def test_ask_disease_question_model_parameter(self):
-        """Test that model parameter is passed correctly."""
-        mock_response = MagicMock()
-        mock_json = MagicMock()
-        mock_json.model_dump.return_value = {
-            "overview": "Test",
-            "causes": "Test",
-            "treatments": "Test"
-        }
-        mock_response.json = mock_json
-        mock_response.text = None
-
-        self.mock_client.generate_content.return_value = mock_response
-
-        ask_disease_question("What is diabetes?", self.mock_client, model="sonar")
-
-        # Verify generate_content was called
-        assert self.mock_client.generate_content.called
-
-    def test_ask_disease_question_system_prompt(self):
-        """Test that system prompt is set correctly."""
-        mock_response = MagicMock()
-        mock_json = MagicMock()
-        mock_json.model_dump.return_value = {
-            "overview": "Test",
-            "causes": "Test",
-            "treatments": "Test"
-        }
-        mock_response.json = mock_json
-        mock_response.text = None
-
-        self.mock_client.generate_content.return_value = mock_response
-
-        ask_disease_question("What is diabetes?", self.mock_client)
-
-        # Verify that generate_content was called with ModelInput
-        call_args = self.mock_client.generate_content.call_args
-        model_input = call_args[0][0]
-        assert isinstance(model_input, ModelInput)
-        assert "medical assistant" in model_input.system_prompt.lower()
-
 
 class TestDisplayResults:
     """Test the display_results function."""
 
-    def test_display_results_with_data(self, capsys):
-        """Test displaying results with valid data."""
-        data = {
-            "overview": "Diabetes is a chronic disease",
-            "causes": "Insulin resistance",
-            "treatments": "Medication and diet",
-            "citations": ["https://example.com/1", "https://example.com/2"]
-        }
-
-        display_results("What is diabetes?", data)
+    @pytest.mark.parametrize("question,data,expected_substrings", [
+        (
+            "What is diabetes?",
+            {
+                "overview": "Diabetes is a chronic disease",
+                "causes": "Insulin resistance",
+                "treatments": "Medication and diet",
+                "citations": ["https://example.com/1", "https://example.com/2"]
+            },
+            [
+                "What is diabetes?", "OVERVIEW", "Diabetes is a chronic disease",
+                "CAUSES", "Insulin resistance", "TREATMENTS", "Medication and diet",
+                "CITATIONS", "https://example.com/1", "https://example.com/2",
+                "=" * 70, "-" * 70, "📋", "🔍",
+            ],
+        ),
+        (
+            "Test question",
+            {
+                "overview": "Overview text",
+                "causes": "Causes text",
+                "treatments": "Treatments text",
+                "citations": []
+            },
+            ["CITATIONS: None provided"],
+        ),
+        ("Test question", None, ["No data received from API"]),
+        ("Test question", {"overview": "Overview text"}, ["Overview text", "N/A"]),
+    ], ids=["with_data", "empty_citations", "no_data", "missing_keys"])
+    def test_display_results(self, question, data, expected_substrings, disease_qa_module, capsys):
+        """Test the rendered output for several response shapes."""
+        disease_qa_module.display_results(question, data)
 
         captured = capsys.readouterr()
-        assert "What is diabetes?" in captured.out
-        assert "OVERVIEW" in captured.out
-        assert "Diabetes is a chronic disease" in captured.out
-        assert "CAUSES" in captured.out
-        assert "Insulin resistance" in captured.out
-        assert "TREATMENTS" in captured.out
-        assert "Medication and diet" in captured.out
-        assert "CITATIONS" in captured.out
-        assert "https://example.com/1" in captured.out
-        assert "https://example.com/2" in captured.out
-
-    def test_display_results_empty_citations(self, capsys):
-        """Test displaying results without citations."""
-        data = {
-            "overview": "Overview text",
-            "causes": "Causes text",
-            "treatments": "Treatments text",
-            "citations": []
-        }
-
-        display_results("Test question", data)
-
-        captured = capsys.readouterr()
-        assert "CITATIONS: None provided" in captured.out
-
-    def test_display_results_no_data(self, capsys):
-        """Test displaying results with None data."""
-        display_results("Test question", None)
-
-        captured = capsys.readouterr()
-        assert "No data received from API" in captured.out
-
-    def test_display_results_missing_keys(self, capsys):
-        """Test displaying results with missing keys."""
-        data = {
-            "overview": "Overview text"
-        }
-
-        display_results("Test question", data)
-
-        captured = capsys.readouterr()
-        assert "Overview text" in captured.out
-        assert "N/A" in captured.out  # For missing keys
-
-    def test_display_results_formatting(self, capsys):
-        """Test that results are properly formatted."""
-        data = {
-            "overview": "Test overview",
-            "causes": "Test causes",
-            "treatments": "Test treatments",
-            "citations": ["Citation 1"]
-        }
-
-        display_results("Question?", data)
-
-        captured = capsys.readouterr()
-        # Check for formatting elements
-        assert "=" * 70 in captured.out
-        assert "-" * 70 in captured.out
-        assert "📋" in captured.out or "OVERVIEW" in captured.out
-        assert "🔍" in captured.out or "CAUSES" in captured.out
+        for expected in expected_substrings:
+            assert expected in captured.out
 
 
 class TestMain:
@@ -243,21 +205,14 @@ class TestMain:
     @patch('disease_qa.PerplexityClient')
     @patch('disease_qa.ask_disease_question')
     @patch('disease_qa.display_results')
-    def test_main_success(self, mock_display, mock_ask, mock_client_class, capsys):
+    def test_main_success(self, mock_display, mock_ask, mock_client_class, disease_qa_module, minimal_payload, capsys):
         """Test main function with successful execution."""
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
-
-        mock_result = {
-            "overview": "Test",
-            "causes": "Test",
-            "treatments": "Test",
-            "citations": []
-        }
-        mock_ask.return_value = mock_result
+        mock_client_class.return_value = _FakeClient()
+
+        mock_ask.return_value = minimal_payload
 
         with patch('sys.argv', ['disease_qa.py', 'What is diabetes?']):
-            main()
+            disease_qa_module.main()
 
         # Verify client was initialized
         mock_client_class.assert_called_once()
@@ -272,40 +227,31 @@ class TestMain:
 
     @patch('disease_qa.PerplexityClient')
     @patch('disease_qa.ask_disease_question')
-    def test_main_with_model_option(self, mock_ask, mock_client_class):
+    def test_main_with_model_option(self, mock_ask, mock_client_class, disease_qa_module, minimal_payload):
         """Test main function with custom model option."""
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
-
-        mock_result = {
-            "overview": "Test",
-            "causes": "Test",
-            "treatments": "Test",
-            "citations": []
-        }
-        mock_ask.return_value = mock_result
+        mock_client_class.return_value = _FakeClient()
+
+        mock_ask.return_value = minimal_payload
 
         with patch('sys.argv', ['disease_qa.py', 'Test question', '-m', 'sonar-pro']):
             with patch('disease_qa.display_results'):
-                main()
+                disease_qa_module.main()
 
         # Verify model parameter was used
         call_args = mock_ask.call_args
         assert call_args[1]['model'] == 'sonar-pro'
 
     @patch('disease_qa.PerplexityClient')
-    def test_main_api_error(self, mock_client_class, capsys):
+    def test_main_api_error(self, mock_client_class, disease_qa_module, capsys):
         """Test main function with API error."""
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
+        mock_client_class.return_value = _FakeClient()
 
         with patch('disease_qa.ask_disease_question') as mock_ask:
-            from disease_qa import ApiError
-            mock_ask.side_effect = ApiError("API failed")
+            mock_ask.side_effect = disease_qa_module.ApiError("API failed")
 
             with patch('sys.argv', ['disease_qa.py', 'Test question']):
                 with pytest.raises(SystemExit) as exc_info:
-                    main()
+                    disease_qa_module.main()
 
                 assert exc_info.value.code == 1
 
@@ -314,15 +260,14 @@ class TestMain:
 
     @patch('disease_qa.PerplexityClient')
     @patch('disease_qa.ask_disease_question')
-    def test_main_no_result(self, mock_ask, mock_client_class, capsys):
+    def test_main_no_result(self, mock_ask, mock_client_class, disease_qa_module, capsys):
         """Test main function when API returns no result."""
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
+        mock_client_class.return_value = _FakeClient()
         mock_ask.return_value = None
 
         with patch('sys.argv', ['disease_qa.py', 'Test question']):
             with pytest.raises(SystemExit) as exc_info:
-                main()
+                disease_qa_module.main()
 
             assert exc_info.value.code == 1
 
@@ -330,27 +275,27 @@ class TestMain:
         assert "Failed to get a valid response" in captured.out
 
     @patch('disease_qa.PerplexityClient')
-    def test_main_unexpected_error(self, mock_client_class, capsys):
+    def test_main_unexpected_error(self, mock_client_class, disease_qa_module, capsys):
         """Test main function with unexpected error."""
         mock_client_class.side_effect = Exception("Unexpected error")
 
         with patch('sys.argv', ['disease_qa.py', 'Test question']):
             with pytest.raises(SystemExit) as exc_info:
-                main()
+                disease_qa_module.main()
 
             assert exc_info.value.code == 1
 
         captured = capsys.readouterr()
         assert "Unexpected error" in captured.out
 
-    def test_main_keyboard_interrupt(self, capsys):
+    def test_main_keyboard_interrupt(self, disease_qa_module, capsys):
         """Test main function with keyboard interrupt."""
         with patch('disease_qa.PerplexityClient') as mock_client_class:
             mock_client_class.side_effect = KeyboardInterrupt()
 
             with patch('sys.argv', ['disease_qa.py', 'Test question']):
                 with pytest.raises(SystemExit) as exc_info:
-                    main()
+                    disease_qa_module.main()
 
                 assert exc_info.value.code == 0
 
@@ -360,11 +305,11 @@ class TestMain:
     @patch('disease_qa.PerplexityClient')
     @patch('disease_qa.ask_disease_question')
     @patch('disease_qa.display_results')
-    def test_main_help_option(self, mock_display, mock_ask, mock_client_class, capsys):
+    def test_main_help_option(self, mock_display, mock_ask, mock_client_class, disease_qa_module, capsys):
         """Test main function with --help option."""
         with patch('sys.argv', ['disease_qa.py', '--help']):
             with pytest.raises(SystemExit) as exc_info:
-                main()
+                disease_qa_module.main()
 
             # argparse exits with code 0 for help
             assert exc_info.value.code == 0
@@ -374,11 +319,8 @@ class TestIntegration:
     """Integration tests for disease_qa module."""
 
     @patch('disease_qa.PerplexityClient')
-    def test_full_workflow(self, mock_client_class, capsys):
+    def test_full_workflow(self, mock_client_class, disease_qa_module, capsys):
         """Test full workflow from question to displayed results."""
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
-
         response_data = {
             "overview": "Asthma is a respiratory condition",
             "causes": "Allergies, exercise, cold air",
@@ -386,15 +328,12 @@ class TestIntegration:
             "citations": ["https://medical.example.com"]
         }
 
-        mock_response = MagicMock()
-        mock_json = MagicMock()
-        mock_json.model_dump.return_value = response_data
-        mock_response.json = mock_json
-        mock_response.text = None
-        mock_client.generate_content.return_value = mock_response
+        mock_client_class.return_value = _FakeClient(
+            response=_FakeResponse(json=_FakeJson(response_data))
+        )
 
         with patch('sys.argv', ['disease_qa.py', 'What causes asthma?']):
-            main()
+            disease_qa_module.main()
 
         captured = capsys.readouterr()
         assert "What causes asthma?" in captured.out
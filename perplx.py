@@ -1,9 +1,114 @@
 from perplexity import Perplexity
-from typing import List, Dict, Optional, Union
+from typing import List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import logging
+import re
 
-@dataclass
+# Accepted ModelConfig values; the tuples keep display order for error messages
+_MODEL_NAMES = ("sonar", "sonar-pro", "sonar-reasoning", "sonar-reasoning-pro", "sonar-deep-research")
+_REASONING_EFFORTS = ("low", "medium", "high")
+_RESEARCH_DEPTHS = ("brief", "standard", "comprehensive")
+_VALID_MODELS = frozenset(_MODEL_NAMES)
+_VALID_EFFORTS = frozenset(_REASONING_EFFORTS)
+_VALID_DEPTHS = frozenset(_RESEARCH_DEPTHS)
+_VALID_ROLES = frozenset({"user", "assistant", "system"})
+
+# Models that accept the reasoning_effort parameter
+_REASONING_MODELS = frozenset({"sonar-reasoning", "sonar-reasoning-pro"})
+
+# Default sampling temperature per model; unknown models fall back to 0.7
+_DEFAULT_TEMPERATURES = {
+    "sonar": 0.7,
+    "sonar-pro": 0.7,
+    "sonar-reasoning": 0.1,      # Low temperature for precise reasoning
+    "sonar-reasoning-pro": 0.1,
+    "sonar-deep-research": 0.3,  # Moderate temperature for balanced research
+}
+
+# Default cap on concurrent requests in PerplexityModel.generate_text_batch
+_DEFAULT_BATCH_WORKERS = 8
+
+# ModelConfig factory method for each quick_config task type
+_TASK_FACTORIES = {
+    "reasoning": "for_reasoning", "math": "for_reasoning", "logic": "for_reasoning", "problem": "for_reasoning",
+    "research": "for_research", "analysis": "for_research", "study": "for_research",
+    "chat": "for_chat", "conversation": "for_chat", "general": "for_chat",
+}
+
+# Prompt keywords used by PerplexityModel._select_optimal_model
+_COMPLEX_KEYWORDS = frozenset({
+    "prove", "theorem", "logic", "reasoning", "step by step", "analyze",
+    "calculate", "solve", "derivation", "mathematical", "algorithm"
+})
+_RESEARCH_KEYWORDS = frozenset({
+    "research", "analyze", "comprehensive", "detailed analysis", "compare",
+    "literature review", "current state", "developments", "trends"
+})
+_REASONING_KEYWORDS = frozenset({
+    "solve", "proof", "calculate", "derive", "explain why", "logic",
+    "reasoning", "problem", "puzzle", "mathematical"
+})
+
+
+def _keyword_pattern(keywords: frozenset) -> "re.Pattern[str]":
+    """Compile a case-insensitive alternation matching any keyword as a substring."""
+    return re.compile("|".join(map(re.escape, sorted(keywords))), re.IGNORECASE)
+
+
+_COMPLEX_RE = _keyword_pattern(_COMPLEX_KEYWORDS)
+_RESEARCH_RE = _keyword_pattern(_RESEARCH_KEYWORDS)
+_REASONING_RE = _keyword_pattern(_REASONING_KEYWORDS)
+
+
+# Model for each task category derived by PerplexityModel._select_optimal_model
+_MODEL_BY_CATEGORY = {
+    "research": "sonar-deep-research",
+    "complex_reasoning": "sonar-reasoning-pro",
+    "reasoning": "sonar-reasoning",
+    "general": "sonar-pro",
+}
+
+
+# Research-assistant instructions for sonar-deep-research, keyed by research_depth
+_RESEARCH_DEPTH_PROMPTS = {
+    "brief": "Provide a concise but informative overview with key sources.",
+    "standard": "Provide a thorough analysis with relevant sources and context.",
+    "comprehensive": "Provide an in-depth analysis with extensive sources, current developments, and detailed context."
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _build_system_prompt_cached(base_system_prompt: Optional[str],
+                                model: str,
+                                research_depth: Optional[str],
+                                use_step_by_step: bool) -> Optional[str]:
+    """Build the system prompt for a model (few distinct inputs, so results are cached)."""
+    prompts = []
+
+    # Add base system prompt if provided
+    if base_system_prompt:
+        prompts.append(base_system_prompt)
+
+    # Add model-specific optimizations
+    if model in _REASONING_MODELS:
+        if use_step_by_step:
+            prompts.append("Think step by step and show your reasoning process clearly.")
+        else:
+            prompts.append("Provide clear logical reasoning for your answer.")
+
+    elif model == "sonar-deep-research":
+        if research_depth:
+            depth_prompt = _RESEARCH_DEPTH_PROMPTS.get(research_depth, _RESEARCH_DEPTH_PROMPTS["standard"])
+            prompts.append(f"You are a research assistant. {depth_prompt}")
+        else:
+            prompts.append("You are a research assistant. Provide accurate information with relevant sources.")
+
+    return " ".join(prompts) if prompts else None
+
+
+@dataclass(slots=True)
 class ModelConfig:
     """
     Configuration dataclass for Perplexity model parameters.
@@ -40,10 +145,8 @@ class ModelConfig:
         
         # Validate model
         if self.model is not None:
-            valid_models = ["sonar", "sonar-pro", "sonar-reasoning", 
-                          "sonar-reasoning-pro", "sonar-deep-research"]
-            if self.model not in valid_models:
-                raise ValueError(f"model must be one of: {valid_models}")
+            if self.model not in _VALID_MODELS:
+                raise ValueError(f"model must be one of: {list(_MODEL_NAMES)}")
         
         # Validate temperature
         if self.temperature is not None:
@@ -57,17 +160,17 @@ class ModelConfig:
         
         # Validate reasoning_effort
         if self.reasoning_effort is not None:
-            valid_efforts = ["low", "medium", "high"]
-            if self.reasoning_effort.lower() not in valid_efforts:
-                raise ValueError(f"reasoning_effort must be one of: {valid_efforts}")
-            self.reasoning_effort = self.reasoning_effort.lower()
+            reasoning_effort = self.reasoning_effort.lower()
+            if reasoning_effort not in _VALID_EFFORTS:
+                raise ValueError(f"reasoning_effort must be one of: {list(_REASONING_EFFORTS)}")
+            self.reasoning_effort = reasoning_effort
         
         # Validate research_depth
         if self.research_depth is not None:
-            valid_depths = ["brief", "standard", "comprehensive"]
-            if self.research_depth.lower() not in valid_depths:
-                raise ValueError(f"research_depth must be one of: {valid_depths}")
-            self.research_depth = self.research_depth.lower()
+            research_depth = self.research_depth.lower()
+            if research_depth not in _VALID_DEPTHS:
+                raise ValueError(f"research_depth must be one of: {list(_RESEARCH_DEPTHS)}")
+            self.research_depth = research_depth
         
         # Validate conversation_history format
         if self.conversation_history is not None:
@@ -79,7 +182,7 @@ class ModelConfig:
                     raise ValueError("conversation_history items must be dictionaries")
                 if "role" not in msg or "content" not in msg:
                     raise ValueError("conversation_history items must have 'role' and 'content' keys")
-                if msg["role"] not in ["user", "assistant", "system"]:
+                if msg["role"] not in _VALID_ROLES:
                     raise ValueError("conversation_history role must be 'user', 'assistant', or 'system'")
         
         self._validated = True
@@ -87,15 +190,16 @@ class ModelConfig:
     def to_dict(self) -> Dict:
         """Convert config to dictionary, excluding None values and private fields."""
         return {
-            k: v for k, v in self.__dict__.items() 
-            if v is not None and not k.startswith('_')
+            k: v for k in self.__slots__
+            if not k.startswith('_') and (v := getattr(self, k)) is not None
         }
     
     def merge(self, other: 'ModelConfig') -> 'ModelConfig':
         """Merge with another config, with other taking precedence."""
         merged_dict = self.to_dict()
-        other_dict = other.to_dict()
-        merged_dict.update(other_dict)
+        for k in other.__slots__:
+            if not k.startswith('_') and (v := getattr(other, k)) is not None:
+                merged_dict[k] = v
         return ModelConfig(**merged_dict)
     
     def copy(self) -> 'ModelConfig':
@@ -149,14 +253,10 @@ class ModelConfig:
         """Quick configuration based on task type string."""
         task_type = task_type.lower()
         
-        if task_type in ["reasoning", "math", "logic", "problem"]:
-            return cls.for_reasoning(**kwargs)
-        elif task_type in ["research", "analysis", "study"]:
-            return cls.for_research(**kwargs)
-        elif task_type in ["chat", "conversation", "general"]:
-            return cls.for_chat(**kwargs)
-        else:
+        factory_name = _TASK_FACTORIES.get(task_type)
+        if factory_name is None:
             raise ValueError(f"Unknown task_type: {task_type}")
+        return getattr(cls, factory_name)(**kwargs)
 
 
 class PerplexityModel:
@@ -172,13 +272,7 @@ class PerplexityModel:
     """
     
     # Available Perplexity models
-    AVAILABLE_MODELS = [
-        "sonar",
-        "sonar-pro", 
-        "sonar-reasoning",
-        "sonar-reasoning-pro",
-        "sonar-deep-research"
-    ]
+    AVAILABLE_MODELS = _MODEL_NAMES
     
     def __init__(self, default_model: str = "sonar-pro"):
         """
@@ -187,14 +281,22 @@ class PerplexityModel:
         Args:
             default_model: Default model to use for completions.
         """
-        self.client = Perplexity()
         self.default_model = self._validate_model(default_model)
-        self.logger = logging.getLogger(__name__)
-        
+    
+    @functools.cached_property
+    def client(self) -> Perplexity:
+        """Perplexity SDK client, created on first API call."""
+        return Perplexity()
+    
+    @functools.cached_property
+    def logger(self) -> logging.Logger:
+        """Logger for this instance, looked up on first use."""
+        return logging.getLogger(__name__)
+    
     def _validate_model(self, model: str) -> str:
         """Validate that the model is available."""
         if model not in self.AVAILABLE_MODELS:
-            raise ValueError(f"Model '{model}' not available. Choose from: {self.AVAILABLE_MODELS}")
+            raise ValueError(f"Model '{model}' not available. Choose from: {list(self.AVAILABLE_MODELS)}")
         return model
     
     def chat(self, 
@@ -285,14 +387,14 @@ class PerplexityModel:
             reasoning_effort=effort
         )
     
-    def get_available_models(self) -> List[str]:
-        """Return list of available models."""
-        return self.AVAILABLE_MODELS.copy()
+    def get_available_models(self) -> Tuple[str, ...]:
+        """Return the available models as an immutable tuple."""
+        return self.AVAILABLE_MODELS
     
     def set_default_model(self, model: str) -> None:
         """Set the default model for future requests."""
         self.default_model = self._validate_model(model)
-        self.logger.info(f"Default model set to: {model}")
+        self.logger.info("Default model set to: %s", model)
     
     def generate_text(self, 
                      prompt: str,
@@ -420,42 +522,79 @@ class PerplexityModel:
         # Add current user prompt
         messages.append({"role": "user", "content": prompt})
         
-        # Build completion parameters
-        completion_params = {
-            "model": model,
-            "messages": messages
-        }
+        return self._create_completion(model, messages, temperature, max_tokens, reasoning_effort)
+    
+    def _create_completion(self,
+                           model: str,
+                           messages: List[Dict[str, str]],
+                           temperature: Optional[float] = None,
+                           max_tokens: Optional[int] = None,
+                           reasoning_effort: Optional[str] = None) -> str:
+        """
+        Send a prepared messages list to the API and return the response text.
         
-        # Add optional parameters if provided
-        if temperature is not None:
-            completion_params["temperature"] = temperature
-        if max_tokens is not None:
-            completion_params["max_tokens"] = max_tokens
+        Args:
+            model: Validated model name.
+            messages: Complete messages list, ending with the current user message.
+            temperature: Sampling temperature (0.0 to 1.0).
+            max_tokens: Maximum tokens in response.
+            reasoning_effort: Reasoning effort level for reasoning models ("low", "medium", "high").
+            
+        Returns:
+            The generated response as a string.
+        """
         if reasoning_effort is not None:
             # Validate reasoning effort parameter and model compatibility
-            valid_efforts = ["low", "medium", "high"]
-            reasoning_models = ["sonar-reasoning", "sonar-reasoning-pro"]
+            reasoning_effort = reasoning_effort.lower()
+            if reasoning_effort not in _VALID_EFFORTS:
+                raise ValueError(f"reasoning_effort must be one of: {list(_REASONING_EFFORTS)}")
             
-            if reasoning_effort.lower() not in valid_efforts:
-                raise ValueError(f"reasoning_effort must be one of: {valid_efforts}")
-            
-            if model not in reasoning_models:
-                self.logger.warning(f"reasoning_effort parameter is only supported by reasoning models "
-                                  f"({reasoning_models}). Current model: {model}. Parameter will be ignored.")
-            else:
-                completion_params["reasoning_effort"] = reasoning_effort.lower()
+            if model not in _REASONING_MODELS:
+                self.logger.warning("reasoning_effort parameter is only supported by reasoning models "
+                                    "(%s). Current model: %s. Parameter will be ignored.",
+                                    sorted(_REASONING_MODELS), model)
+                reasoning_effort = None
+        
+        # Build completion parameters, leaving out optional ones that were not provided
+        completion_params = {
+            key: value for key, value in (
+                ("model", model),
+                ("messages", messages),
+                ("temperature", temperature),
+                ("max_tokens", max_tokens),
+                ("reasoning_effort", reasoning_effort),
+            )
+            if value is not None
+        }
         
         try:
-            self.logger.info(f"Making request to {model} with prompt: {prompt[:100]}...")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Making request to %s with prompt: %s...", model, messages[-1]["content"][:100])
             completion = self.client.chat.completions.create(**completion_params)
             response = completion.choices[0].message.content
-            self.logger.info(f"Received response: {response[:100]}...")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Received response: %s...", response[:100])
             return response
             
         except Exception as e:
-            self.logger.error(f"Error during API call: {str(e)}")
+            self.logger.error("Error during API call: %s", e)
             raise
     
+    def start_conversation(self,
+                           system_prompt: Optional[str] = None,
+                           model: Optional[str] = None) -> 'ConversationSession':
+        """
+        Start a multi-turn conversation that keeps its message history between turns.
+        
+        Args:
+            system_prompt: Optional system prompt for the whole conversation.
+            model: Model to use (defaults to instance default).
+            
+        Returns:
+            A ConversationSession bound to this PerplexityModel.
+        """
+        return ConversationSession(self, system_prompt=system_prompt, model=model)
+    
     def generate_text_with_config(self, prompt: str, config: ModelConfig) -> str:
         """
         Generate text using a ModelConfig object.
@@ -482,45 +621,55 @@ class PerplexityModel:
             use_step_by_step=config.use_step_by_step
         )
     
+    def generate_text_batch(self,
+                            prompts: List[str],
+                            max_workers: Optional[int] = None,
+                            **kwargs) -> List[str]:
+        """
+        Generate responses for several prompts concurrently.
+        
+        Requests are network-bound, so they are issued from a thread pool with
+        up to max_workers in flight at once instead of one after another.
+        
+        Args:
+            prompts: The input prompts/questions.
+            max_workers: Maximum number of concurrent requests (defaults to at most 8).
+            **kwargs: Any generate_text() parameters, applied to every prompt.
+            
+        Returns:
+            Generated text responses, in the same order as prompts.
+        """
+        if not prompts:
+            return []
+        
+        # Create the shared client up front: cached_property is not thread-safe,
+        # so workers racing on first access could each build their own client
+        _ = self.client
+        
+        if max_workers is None:
+            max_workers = min(len(prompts), _DEFAULT_BATCH_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda prompt: self.generate_text(prompt, **kwargs), prompts))
+    
     def _select_optimal_model(self, 
                              prompt: str,
                              research_depth: Optional[str] = None,
                              reasoning_effort: Optional[str] = None,
                              use_step_by_step: bool = False) -> str:
         """Select the most appropriate model based on the task characteristics."""
-        
-        # Research tasks
         if research_depth is not None:
-            return "sonar-deep-research"
-        
-        # Reasoning tasks
-        if reasoning_effort is not None or use_step_by_step:
-            # Check prompt complexity for pro vs standard
-            complex_keywords = [
-                "prove", "theorem", "logic", "reasoning", "step by step", "analyze",
-                "calculate", "solve", "derivation", "mathematical", "algorithm"
-            ]
-            is_complex = any(keyword in prompt.lower() for keyword in complex_keywords)
-            return "sonar-reasoning-pro" if is_complex else "sonar-reasoning"
-        
-        # Check for research/analysis indicators
-        research_keywords = [
-            "research", "analyze", "comprehensive", "detailed analysis", "compare",
-            "literature review", "current state", "developments", "trends"
-        ]
-        if any(keyword in prompt.lower() for keyword in research_keywords):
-            return "sonar-deep-research"
-        
-        # Check for reasoning indicators
-        reasoning_keywords = [
-            "solve", "proof", "calculate", "derive", "explain why", "logic",
-            "reasoning", "problem", "puzzle", "mathematical"
-        ]
-        if any(keyword in prompt.lower() for keyword in reasoning_keywords):
-            return "sonar-reasoning"
-        
-        # Default to sonar-pro for general queries
-        return "sonar-pro"
+            # Research tasks
+            category = "research"
+        elif reasoning_effort is not None or use_step_by_step:
+            # Reasoning tasks: prompt complexity picks pro vs standard
+            category = "complex_reasoning" if _COMPLEX_RE.search(prompt) else "reasoning"
+        elif _RESEARCH_RE.search(prompt):
+            category = "research"
+        elif _REASONING_RE.search(prompt):
+            category = "reasoning"
+        else:
+            category = "general"
+        return _MODEL_BY_CATEGORY[category]
     
     def _build_system_prompt(self, 
                            base_system_prompt: Optional[str],
@@ -528,41 +677,73 @@ class PerplexityModel:
                            research_depth: Optional[str] = None,
                            use_step_by_step: bool = False) -> Optional[str]:
         """Build an optimized system prompt based on model and parameters."""
+        return _build_system_prompt_cached(base_system_prompt, model, research_depth, use_step_by_step)
+    
+    def _get_default_temperature(self, model: str) -> float:
+        """Get intelligent default temperature based on model type."""
+        return _DEFAULT_TEMPERATURES.get(model, 0.7)  # 0.7 for creative/general responses
+
+
+class ConversationSession:
+    """
+    A multi-turn conversation with a single Perplexity model.
+    
+    The session owns one messages list and appends each user prompt and
+    assistant reply to it, so a turn sends the existing history as-is instead
+    of copying it into a fresh list the way conversation_history does.
+    """
+    
+    def __init__(self,
+                 perplexity_model: PerplexityModel,
+                 system_prompt: Optional[str] = None,
+                 model: Optional[str] = None):
+        """
+        Initialize the ConversationSession.
         
-        prompts = []
-        
-        # Add base system prompt if provided
-        if base_system_prompt:
-            prompts.append(base_system_prompt)
+        Args:
+            perplexity_model: PerplexityModel used to make the API calls.
+            system_prompt: Optional system prompt for the whole conversation.
+            model: Model to use (defaults to the PerplexityModel default).
+        """
+        self.perplexity_model = perplexity_model
+        self.model = perplexity_model._validate_model(model or perplexity_model.default_model)
+        
+        # Same model-specific system prompt that generate_text builds for each call
+        system_prompt = perplexity_model._build_system_prompt(system_prompt, self.model)
+        self.messages: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}] if system_prompt else []
+    
+    def ask(self,
+            prompt: str,
+            temperature: Optional[float] = None,
+            max_tokens: Optional[int] = None,
+            reasoning_effort: Optional[str] = None) -> str:
+        """
+        Send the next user prompt and record the reply in the conversation.
         
-        # Add model-specific optimizations
-        if "reasoning" in model:
-            if use_step_by_step:
-                prompts.append("Think step by step and show your reasoning process clearly.")
-            else:
-                prompts.append("Provide clear logical reasoning for your answer.")
+        Args:
+            prompt: The user prompt/question.
+            temperature: Sampling temperature (0.0 to 1.0), defaulting per model as in generate_text.
+            max_tokens: Maximum tokens in response.
+            reasoning_effort: Reasoning effort level for reasoning models ("low", "medium", "high").
+            
+        Returns:
+            The generated response as a string.
+        """
+        if temperature is None:
+            temperature = self.perplexity_model._get_default_temperature(self.model)
         
-        elif "deep-research" in model:
-            depth_map = {
-                "brief": "Provide a concise but informative overview with key sources.",
-                "standard": "Provide a thorough analysis with relevant sources and context.",
-                "comprehensive": "Provide an in-depth analysis with extensive sources, current developments, and detailed context."
-            }
-            if research_depth:
-                prompts.append(f"You are a research assistant. {depth_map.get(research_depth, depth_map['standard'])}")
-            else:
-                prompts.append("You are a research assistant. Provide accurate information with relevant sources.")
+        self.messages.append({"role": "user", "content": prompt})
+        try:
+            response = self.perplexity_model._create_completion(
+                self.model, self.messages, temperature, max_tokens, reasoning_effort
+            )
+        except Exception:
+            # Leave the history as it was before the failed turn
+            self.messages.pop()
+            raise
         
-        return " ".join(prompts) if prompts else None
-    
-    def _get_default_temperature(self, model: str) -> float:
-        """Get intelligent default temperature based on model type."""
-        if "reasoning" in model:
-            return 0.1  # Low temperature for precise reasoning
-        elif "research" in model:
-            return 0.3  # Moderate temperature for balanced research
-        else:
-            return 0.7  # Higher temperature for creative/general responses
+        self.messages.append({"role": "assistant", "content": response})
+        return response
 
 
 # Example usage and comprehensive demonstration
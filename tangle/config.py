@@ -1,8 +1,15 @@
 """Configuration for available models and vision processing parameters."""
 
+from __future__ import annotations
+
+import functools
+import sys
 from dataclasses import dataclass, field
-from typing import Optional, Type, Any, List
-from pydantic import BaseModel
+from typing import TYPE_CHECKING, Optional, Type, Any, List, Sequence
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: pydantic is only needed once a response_model is given
+    from pydantic import BaseModel
 
 # Vision model defaults
 DEFAULT_TEMPERATURE = 0.2
@@ -12,20 +19,49 @@ DEFAULT_PROMPT = "Describe this image in detail"
 # Image processing
 # Supported formats: PNG, JPEG, WEBP, GIF (50MB size limit per image)
 SUPPORTED_IMAGE_TYPES = ("jpg", "jpeg", "png", "gif", "webp")
+_SUPPORTED_IMAGE_TYPES_SET = frozenset(SUPPORTED_IMAGE_TYPES)
 IMAGE_MIME_TYPE = "image/jpeg"
 
 # Common image domain exclusions (denylist)
-EXCLUDE_STOCK_PHOTOS = ["-gettyimages.com", "-shutterstock.com", "-istockphoto.com"]
+EXCLUDE_STOCK_PHOTOS = ("-gettyimages.com", "-shutterstock.com", "-istockphoto.com")
 """Stock photo sites with watermarked/licensed content"""
 
-EXCLUDE_SOCIAL_MEDIA = ["-pinterest.com"]
+EXCLUDE_SOCIAL_MEDIA = ("-pinterest.com",)
 """Social media platforms with mixed quality/attribution"""
 
 EXCLUDE_COMMON_WATERMARKED = EXCLUDE_STOCK_PHOTOS + EXCLUDE_SOCIAL_MEDIA
-"""Combined list of common watermarked/low-quality image sources"""
+"""Combined tuple of common watermarked/low-quality image sources"""
+
+# Accepted SearchFilter.recency values
+_VALID_RECENCY = frozenset({"day", "week", "month", "year"})
+
+# SearchFilter time fields and the API parameters they map to
+_SEARCH_FILTER_PARAMS = (
+    ("recency", "search_recency_filter"),
+    ("published_after", "search_after_date_filter"),
+    ("published_before", "search_before_date_filter"),
+    ("updated_after", "last_updated_after_filter"),
+    ("updated_before", "last_updated_before_filter"),
+)
+
+
+def _prefix_denylist(domains: Sequence[str], cache: Optional[tuple]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """Return a (domains, "-"-prefixed domains) cache entry, rebuilt only when domains changed."""
+    source = tuple(domains)
+    if cache is None or cache[0] != source:
+        cache = (source, tuple(map("-{}".format, source)))
+    return cache
 
 
-@dataclass
+@functools.lru_cache(maxsize=256)
+def _is_pydantic_model(response_model: Any) -> bool:
+    """Return whether response_model is a Pydantic BaseModel subclass (cached per class)."""
+    from pydantic import BaseModel
+
+    return isinstance(response_model, type) and issubclass(response_model, BaseModel)
+
+
+@dataclass(slots=True)
 class ImageFilter:
     """High-level image filtering interface for users.
 
@@ -54,6 +90,8 @@ class ImageFilter:
     """Image formats to return. Examples: ["jpg", "png", "webp"]
     Supported formats: jpg, jpeg, png, gif, webp"""
 
+    _prefixed_blocked_image_domains: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self):
         """Validate filter configuration."""
         if self.allowed_image_domains and self.blocked_image_domains:
@@ -66,7 +104,7 @@ class ImageFilter:
             raise ValueError(f"Maximum 10 domains allowed in blocked_image_domains, got {len(self.blocked_image_domains)}")
 
         if self.image_formats:
-            invalid_formats = set(self.image_formats) - set(SUPPORTED_IMAGE_TYPES)
+            invalid_formats = set(self.image_formats).difference(_SUPPORTED_IMAGE_TYPES_SET)
             if invalid_formats:
                 raise ValueError(f"Invalid image formats: {invalid_formats}. Supported: {SUPPORTED_IMAGE_TYPES}")
 
@@ -77,14 +115,18 @@ class ImageFilter:
         - Converting blocked_image_domains to image_domain_filter with minus sign prefix
         - Keeping allowed_image_domains as-is in image_domain_filter
         - Converting image_formats to image_format_filter
+
+        The prefixed denylist is cached and rebuilt whenever blocked_image_domains
+        changes. Each call returns a new list, so callers may mutate it freely.
         """
         params = {}
 
         if self.allowed_image_domains:
             params["image_domain_filter"] = self.allowed_image_domains
         elif self.blocked_image_domains:
-            # Add minus prefix for denylist mode
-            params["image_domain_filter"] = [f"-{domain}" for domain in self.blocked_image_domains]
+            # Add minus prefix for denylist mode (cached until blocked_image_domains changes)
+            self._prefixed_blocked_image_domains = _prefix_denylist(self.blocked_image_domains, self._prefixed_blocked_image_domains)
+            params["image_domain_filter"] = list(self._prefixed_blocked_image_domains[1])
 
         if self.image_formats:
             params["image_format_filter"] = self.image_formats
@@ -92,7 +134,7 @@ class ImageFilter:
         return params
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchFilter:
     """High-level search filtering interface for users.
 
@@ -130,6 +172,8 @@ class SearchFilter:
     updated_before: Optional[str] = None
     """Filter by last update date - latest date (format: m/d/Y, e.g., "3/1/2025")"""
 
+    _prefixed_blocked_domains: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self):
         """Validate filter configuration."""
         # Domain filtering validation
@@ -147,7 +191,7 @@ class SearchFilter:
                             self.updated_after or self.updated_before):
             raise ValueError("Cannot combine 'recency' with specific date filters. Choose one approach.")
 
-        if self.recency and self.recency not in ("day", "week", "month", "year"):
+        if self.recency and self.recency not in _VALID_RECENCY:
             raise ValueError("recency must be one of: 'day', 'week', 'month', 'year'")
 
     def to_model_config(self) -> dict:
@@ -156,33 +200,33 @@ class SearchFilter:
         Automatically handles:
         - Converting blocked_domains to search_domain_filter with minus sign prefix
         - Keeping allowed_domains as-is in search_domain_filter
+
+        The prefixed denylist is cached and rebuilt whenever blocked_domains
+        changes. Each call returns a new list, so callers may mutate it freely.
         """
         params = {}
 
         if self.allowed_domains:
             params["search_domain_filter"] = self.allowed_domains
         elif self.blocked_domains:
-            # Add minus prefix for denylist mode
-            params["search_domain_filter"] = [f"-{domain}" for domain in self.blocked_domains]
-
-        if self.recency:
-            params["search_recency_filter"] = self.recency
-        if self.published_after:
-            params["search_after_date_filter"] = self.published_after
-        if self.published_before:
-            params["search_before_date_filter"] = self.published_before
-        if self.updated_after:
-            params["last_updated_after_filter"] = self.updated_after
-        if self.updated_before:
-            params["last_updated_before_filter"] = self.updated_before
+            # Add minus prefix for denylist mode (cached until blocked_domains changes)
+            self._prefixed_blocked_domains = _prefix_denylist(self.blocked_domains, self._prefixed_blocked_domains)
+            params["search_domain_filter"] = list(self._prefixed_blocked_domains[1])
+
+        for attr, param in _SEARCH_FILTER_PARAMS:
+            value = getattr(self, attr)
+            if value:
+                params[param] = value
 
         return params
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelConfig:
     """Configuration for model interactions.
 
+    Instances are immutable; derive variants with dataclasses.replace().
+
     Attributes:
         model: Model name (sonar, sonar-pro)
         temperature: Randomness/creativity (0.0-2.0), default 0.2
@@ -223,8 +267,28 @@ class ModelConfig:
     top_p: float = 0.9
     top_k: int = 0
 
+    def __post_init__(self):
+        """Validate numeric parameter ranges and intern enumerated string settings."""
+        if not 0.0 <= self.temperature <= 2.0:
+            raise ValueError(f"temperature must be between 0.0 and 2.0, got {self.temperature}")
+
+        if not 0.0 <= self.top_p <= 1.0:
+            raise ValueError(f"top_p must be between 0.0 and 1.0, got {self.top_p}")
+
+        if self.max_tokens <= 0:
+            raise ValueError(f"max_tokens must be a positive integer, got {self.max_tokens}")
 
-@dataclass
+        if self.top_k < 0:
+            raise ValueError(f"top_k must be non-negative, got {self.top_k}")
+
+        # Intern the enumerated string settings so configs share one object per value
+        for name in ("model", "search_mode", "language_preference", "reasoning_effort"):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
+
+
+@dataclass(slots=True)
 class ChatConfig:
     """Configuration for chat session management."""
 
@@ -233,7 +297,7 @@ class ChatConfig:
     save_dir: str = "."
 
 
-@dataclass
+@dataclass(slots=True)
 class ModelInput:
     """Input parameters for model interactions."""
 
@@ -242,6 +306,11 @@ class ModelInput:
     pdf_path: Optional[str] = None
     system_prompt: Optional[str] = None
     response_model: Optional[Type[BaseModel]] = None
+    # Build the response with model_construct() instead of validating it. Only for
+    # providers that already enforce the JSON schema; malformed data is not caught.
+    # Models with nested BaseModel fields are always validated, since model_construct()
+    # would leave those fields as raw dicts.
+    response_model_trusted: bool = False
 
     def __post_init__(self):
         """Validate input after initialization."""
@@ -257,16 +326,18 @@ class ModelInput:
         # Validate response_model is a Pydantic BaseModel
         if self.response_model is not None:
             try:
-                if not (isinstance(self.response_model, type) and issubclass(self.response_model, BaseModel)):
+                if not _is_pydantic_model(self.response_model):
                     raise ValueError("response_model must be a Pydantic BaseModel class")
             except TypeError:
                 raise ValueError("response_model must be a Pydantic BaseModel class")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ModelOutput:
     """Output from LLM model interactions.
 
+    Instances are immutable once returned by the client.
+
     Either 'text' or 'json' will be populated depending on whether response_model was provided.
     If response_model was provided, 'json' contains the parsed model instance and 'text' may be None.
     If no response_model was provided, 'text' contains the response and 'json' will be None.
@@ -293,16 +364,16 @@ class ModelOutput:
     json: Optional[BaseModel] = None
     """Parsed model instance if response_model was provided (available only when response_model provided)."""
 
-    search_results: List[dict] = field(default_factory=list)
+    search_results: Sequence[dict] = ()
     """Search results returned by the API if available."""
 
-    related_questions: List[str] = field(default_factory=list)
+    related_questions: Sequence[str] = ()
     """Related questions suggested by the model if available."""
 
-    images: List[str] = field(default_factory=list)
+    images: Sequence[str] = ()
     """Image URLs returned by the model if return_images was enabled."""
 
-    videos: List[str] = field(default_factory=list)
+    videos: Sequence[str] = ()
     """Video URLs returned by the model if return_videos was enabled."""
 
     search_context_size: Optional[int] = None
@@ -313,3 +384,10 @@ class ModelOutput:
 
     num_search_queries: Optional[int] = None
     """Number of search queries performed if available."""
+
+    def __post_init__(self):
+        """Intern the low-cardinality model and finish_reason strings shared across outputs."""
+        for name in ("model", "finish_reason"):
+            value = getattr(self, name)
+            if isinstance(value, str):
+                object.__setattr__(self, name, sys.intern(value))
@@ -1,11 +1,21 @@
 """Image processing utilities for vision analysis."""
 
-import base64
+import functools
+import hashlib
 import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
-from PIL import Image
-import io
+from typing import Callable, Optional, List, Tuple
+
+try:
+    # SIMD-accelerated encoder; output is identical to base64.b64encode
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
 
 from config import IMAGE_MIME_TYPE
 
@@ -18,6 +28,124 @@ MAX_TOTAL_IMAGE_PAYLOAD_MB = 50
 MAX_TOTAL_IMAGE_PAYLOAD_BYTES = MAX_TOTAL_IMAGE_PAYLOAD_MB * 1024 * 1024
 MIN_IMAGE_DIMENSION = 32  # Minimum 32x32 pixels
 
+# JPEG qualities tried when shrinking an oversized image payload, best first
+_RESIZE_QUALITIES = tuple(range(85, 10, -5))
+
+# Scale factors tried, largest first, once even the lowest quality is too large
+_RESIZE_SCALES = tuple(step / 10 for step in range(9, 0, -1))
+
+# Read size for streaming base64 encoding; a multiple of 3 so chunks encode without padding
+_BASE64_CHUNK_SIZE = 3 * 19 * 1024
+
+# Prefix of every encoded image; counted exactly when sizing the payload
+_DATA_URI_PREFIX = f"data:{IMAGE_MIME_TYPE};base64,"
+
+# Resized images, keyed by source content hash, quality and scale, so repeat calls skip recompression.
+# Least recently used entries are evicted once the directory grows past MAX_RESIZED_CACHE_MB.
+# The location can be overridden with the TANGLE_RESIZED_CACHE_DIR environment variable or
+# the cache_dir argument of resize_images_to_fit / clear_resized_cache.
+_DEFAULT_RESIZED_CACHE_DIR = Path.home() / ".cache" / "tangle" / "resized"
+RESIZED_CACHE_DIR_ENV = "TANGLE_RESIZED_CACHE_DIR"
+MAX_RESIZED_CACHE_MB = 500
+MAX_RESIZED_CACHE_BYTES = MAX_RESIZED_CACHE_MB * 1024 * 1024
+
+
+def _resized_cache_dir(cache_dir: Optional[os.PathLike] = None) -> Path:
+    """Return the resized-image cache directory: cache_dir, else the environment override, else the default."""
+    if cache_dir is not None:
+        return Path(cache_dir)
+    return Path(os.environ.get(RESIZED_CACHE_DIR_ENV) or _DEFAULT_RESIZED_CACHE_DIR)
+
+
+def _file_digest(path: str) -> str:
+    """Hash a file's contents in chunks with BLAKE2b (short hex digest for cache keys)."""
+    digest = hashlib.blake2b(digest_size=12)
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(_BASE64_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _prune_resized_cache(cache_dir: Path, keep: List[Path], max_bytes: Optional[int] = None) -> None:
+    """Delete least recently used resized images until cache_dir fits in max_bytes.
+
+    Entries are ordered by mtime, which is refreshed on every cache hit. Paths in
+    keep are never deleted, and in-progress .tmp files are left alone.
+    """
+    if max_bytes is None:
+        max_bytes = MAX_RESIZED_CACHE_BYTES
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".jpg"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, Path(entry.path)))
+
+    total_size = sum(size for _, size, _ in entries)
+    keep_set = set(keep)
+    for _, size, path in sorted(entries):
+        if total_size <= max_bytes:
+            break
+        if path in keep_set:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass  # Already evicted by a concurrent caller
+        total_size -= size
+
+
+# Encoded data URIs, keyed by (path, mtime, size), least recently used first.
+# Entries are evicted once their combined length passes MAX_ENCODED_CACHE_MB.
+_encoded_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_encoded_cache_lock = threading.Lock()
+_encoded_cache_bytes = 0
+MAX_ENCODED_CACHE_MB = 64
+MAX_ENCODED_CACHE_BYTES = MAX_ENCODED_CACHE_MB * 1024 * 1024
+
+
+def _encode_file_cached(path_str: str, mtime_ns: int, size: int) -> str:
+    """Base64-encode a file as a data URI, cached per (path, mtime, size).
+
+    The modification time and size are part of the key so an edited file is
+    re-encoded. Data URIs longer than MAX_ENCODED_CACHE_BYTES are not cached.
+    """
+    key = (path_str, mtime_ns, size)
+    with _encoded_cache_lock:
+        if key in _encoded_cache:
+            _encoded_cache.move_to_end(key)
+            return _encoded_cache[key]
+
+    # Encode chunk by chunk so the raw file is never held in memory as a whole
+    buffer = bytearray(_DATA_URI_PREFIX.encode("ascii"))
+    with open(path_str, "rb") as file:
+        for chunk in iter(lambda: file.read(_BASE64_CHUNK_SIZE), b""):
+            buffer += b64encode(chunk)
+    encoded = buffer.decode("ascii")
+
+    if len(encoded) <= MAX_ENCODED_CACHE_BYTES:
+        global _encoded_cache_bytes
+        with _encoded_cache_lock:
+            if key not in _encoded_cache:
+                _encoded_cache[key] = encoded
+                _encoded_cache_bytes += len(encoded)
+                while _encoded_cache_bytes > MAX_ENCODED_CACHE_BYTES:
+                    _, evicted = _encoded_cache.popitem(last=False)
+                    _encoded_cache_bytes -= len(evicted)
+    return encoded
+
+
+@functools.lru_cache(maxsize=128)
+def _image_dimensions_cached(path_str: str, mtime_ns: int, size: int) -> Tuple[int, int]:
+    """Read an image's (width, height) with PIL, cached per (path, mtime, size)."""
+    # PIL is imported on first use so importing this module stays cheap
+    from PIL import Image
+
+    with Image.open(path_str) as img:
+        return img.size
+
 class ImageUtils:
     """Handles image encoding and validation."""
 
@@ -38,7 +166,10 @@ class ImageUtils:
         """
         path = Path(image_path)
 
-        if not path.exists():
+        # Checks run cheapest first and share a single stat() of the file
+        try:
+            stat = path.stat()
+        except (FileNotFoundError, NotADirectoryError):
             logger.error(f"Image file not found: {image_path}")
             raise FileNotFoundError(f"Image file not found: {image_path}")
 
@@ -46,26 +177,20 @@ class ImageUtils:
             logger.error(f"Invalid image file: {image_path}")
             raise ValueError(f"File is not a valid image: {image_path}. Supported formats: PNG, JPEG, WEBP, GIF")
 
-        if not ImageUtils.is_valid_dimensions(path):
-            try:
-                with Image.open(path) as img:
-                    width, height = img.size
-                logger.error(f"Image dimensions too small: {image_path} ({width}x{height})")
-            except:
-                pass
-            raise ValueError(f"Image must be at least {MIN_IMAGE_DIMENSION}x{MIN_IMAGE_DIMENSION} pixels: {image_path}")
-
-        if not ImageUtils.is_valid_size(path):
-            file_size_mb = path.stat().st_size / (1024 * 1024)
+        if stat.st_size > MAX_IMAGE_SIZE_BYTES:
+            file_size_mb = stat.st_size / (1024 * 1024)
             logger.error(f"Image file too large: {image_path} ({file_size_mb:.2f}MB)")
             raise ValueError(f"Image file exceeds {MAX_IMAGE_SIZE_MB}MB limit: {image_path} ({file_size_mb:.2f}MB)")
 
+        dimensions = ImageUtils._probe_dimensions(path, stat)
+        if dimensions is None or min(dimensions) < MIN_IMAGE_DIMENSION:
+            if dimensions is not None:
+                width, height = dimensions
+                logger.error(f"Image dimensions too small: {image_path} ({width}x{height})")
+            raise ValueError(f"Image must be at least {MIN_IMAGE_DIMENSION}x{MIN_IMAGE_DIMENSION} pixels: {image_path}")
+
         try:
-            with open(path, "rb") as file:
-                file_data = file.read()
-                encoded_file = base64.b64encode(file_data).decode("utf-8")
-                base64_url = f"data:{IMAGE_MIME_TYPE};base64,{encoded_file}"
-            return base64_url
+            return _encode_file_cached(str(path.absolute()), stat.st_mtime_ns, stat.st_size)
         except Exception as e:
             logger.error(f"Error encoding image: {e}")
             raise
@@ -108,27 +233,72 @@ class ImageUtils:
         Returns:
             True if image is at least 32x32 pixels, False otherwise
         """
+        dimensions = ImageUtils._probe_dimensions(path)
+        return dimensions is not None and min(dimensions) >= MIN_IMAGE_DIMENSION
+
+    @staticmethod
+    def _probe_dimensions(path: Path, stat: Optional[os.stat_result] = None) -> Optional[Tuple[int, int]]:
+        """
+        Read image dimensions without decoding pixel data.
+
+        Args:
+            path: Path object to the file
+            stat: Result of path.stat() if the caller already has it
+
+        Returns:
+            (width, height) tuple, or None if the image cannot be read
+        """
         try:
-            with Image.open(path) as img:
-                width, height = img.size
-                return width >= MIN_IMAGE_DIMENSION and height >= MIN_IMAGE_DIMENSION
+            if stat is None:
+                stat = path.stat()
+            return _image_dimensions_cached(str(path.absolute()), stat.st_mtime_ns, stat.st_size)
         except Exception as e:
             logger.error(f"Error reading image dimensions: {e}")
-            return False
+            return None
 
     @staticmethod
-    def _estimate_base64_size(data: bytes) -> int:
+    def _base64_size(num_bytes: int) -> int:
         """
-        Estimate the base64 encoded size of binary data.
+        Compute the size of a data URI for binary data of the given length.
 
         Args:
-            data: Binary data
+            num_bytes: Length of the binary data
 
         Returns:
-            Estimated size in bytes after base64 encoding
+            Exact size in bytes of the base64 data URI, including its prefix
         """
-        # Base64 encoding increases size by ~33%
-        return int(len(data) * 4 / 3) + 50  # +50 for data URI prefix overhead
+        # Base64 emits 4 characters per started 3-byte group
+        return 4 * ((num_bytes + 2) // 3) + len(_DATA_URI_PREFIX)
+
+    @staticmethod
+    def _bisect_settings(settings: Tuple, compress: Callable) -> Tuple[Optional[object], Tuple[List[Path], int]]:
+        """
+        Find the first (best) setting whose compressed payload fits the limit.
+
+        Payload size must fall along settings, so the last one is checked first
+        and, if it fits, the rest are bisected.
+
+        Args:
+            settings: Quality or scale values, best first
+            compress: Callable taking one setting and returning (paths, total base64 size)
+
+        Returns:
+            Tuple of (chosen setting, its compression result), or (None, result of
+            the last setting) if even that does not fit
+        """
+        attempts = {settings[-1]: compress(settings[-1])}
+        if attempts[settings[-1]][1] > MAX_TOTAL_IMAGE_PAYLOAD_BYTES:
+            return None, attempts[settings[-1]]
+
+        low, high = 0, len(settings) - 1
+        while low < high:
+            middle = (low + high) // 2
+            attempts[settings[middle]] = compress(settings[middle])
+            if attempts[settings[middle]][1] <= MAX_TOTAL_IMAGE_PAYLOAD_BYTES:
+                high = middle
+            else:
+                low = middle + 1
+        return settings[high], attempts[settings[high]]
 
     @staticmethod
     def _resize_image_to_quality(image_path: str, quality: int = 85, scale_factor: float = 1.0) -> bytes:
@@ -146,13 +316,20 @@ class ImageUtils:
         Raises:
             ValueError: If scaled dimensions would be below minimum
         """
+        from PIL import Image
+        import io
+
         try:
             with Image.open(image_path) as img:
                 # Calculate scaled dimensions
                 if scale_factor < 1.0:
                     new_width = max(MIN_IMAGE_DIMENSION, int(img.width * scale_factor))
                     new_height = max(MIN_IMAGE_DIMENSION, int(img.height * scale_factor))
-                    img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                    if img.format == "JPEG":
+                        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale (never below the target) from the DCT data
+                        img.draft(img.mode, (new_width, new_height))
+                    # Bilinear is several times cheaper than Lanczos and indistinguishable after JPEG recompression
+                    img = img.resize((new_width, new_height), Image.Resampling.BILINEAR)
 
                 # Convert RGBA to RGB if necessary (for JPEG compatibility)
                 if img.mode in ("RGBA", "LA", "P"):
@@ -169,34 +346,107 @@ class ImageUtils:
             raise
 
     @staticmethod
-    def resize_images_to_fit(image_paths: List[str]) -> List[str]:
+    def _compress_images(image_paths: List[str], digests: List[str], quality: int, scale_factor: float,
+                         cache_dir: Path) -> Tuple[List[Path], int]:
+        """
+        Compress every image at one quality/scale setting, reusing cached results.
+
+        Args:
+            image_paths: List of image file paths
+            digests: Content hash of each image, used as its cache key
+            quality: JPEG quality (1-100)
+            scale_factor: Scale factor for dimensions (0.0-1.0)
+            cache_dir: Directory holding the resized images
+
+        Returns:
+            Tuple of (compressed image path per input, total base64 size)
+        """
+        def compress(path: str, digest: str) -> Path:
+            cache_path = cache_dir / f"{digest}_{quality}_{round(scale_factor * 100)}.jpg"
+            try:
+                # Cache hit: refresh the mtime so eviction sees it as recently used
+                os.utime(cache_path)
+                return cache_path
+            except FileNotFoundError:
+                pass
+            try:
+                data = ImageUtils._resize_image_to_quality(path, quality, scale_factor)
+            except Exception as e:
+                logger.error(f"Failed to resize {path} at quality {quality}, scale {scale_factor:.2f}: {e}")
+                raise
+            # Write then rename so concurrent callers never see a partial file
+            fd, temp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_name, cache_path)
+            except BaseException:
+                os.unlink(temp_name)
+                raise
+            return cache_path
+
+        if len(image_paths) == 1:
+            resized_paths = [compress(image_paths[0], digests[0])]
+        else:
+            # Pillow releases the GIL while decoding/encoding, so threads compress images in parallel
+            with ThreadPoolExecutor(max_workers=min(len(image_paths), os.cpu_count() or 1)) as executor:
+                resized_paths = list(executor.map(compress, image_paths, digests))
+
+        total_resized_size = sum(ImageUtils._base64_size(path.stat().st_size) for path in resized_paths)
+        return resized_paths, total_resized_size
+
+    @staticmethod
+    def clear_resized_cache(cache_dir: Optional[os.PathLike] = None) -> int:
+        """
+        Delete every cached resized image.
+
+        Args:
+            cache_dir: Cache directory to clear; defaults to $TANGLE_RESIZED_CACHE_DIR
+                or ~/.cache/tangle/resized
+
+        Returns:
+            Number of files removed
+        """
+        cache_dir = _resized_cache_dir(cache_dir)
+        if not cache_dir.is_dir():
+            return 0
+        removed = 0
+        for path in cache_dir.glob("*.jpg"):
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        logger.info(f"Removed {removed} cached resized images from {cache_dir}")
+        return removed
+
+    @staticmethod
+    def resize_images_to_fit(image_paths: List[str], cache_dir: Optional[os.PathLike] = None) -> List[str]:
         """
         Automatically resize images so total payload doesn't exceed limit.
 
         Resizes images proportionally if their combined base64 size exceeds the limit.
-        Returns paths to resized temporary images or original paths if no resizing needed.
+        JPEG quality is lowered first (85 down to 15) at full size; if even quality 15
+        does not fit, dimensions are scaled down in 10% steps to as little as 10% of
+        the original. Returns paths to resized images in the resize cache (capped at
+        MAX_RESIZED_CACHE_MB) or original paths if no resizing needed.
 
         Args:
             image_paths: List of image file paths
+            cache_dir: Directory for resized images; defaults to $TANGLE_RESIZED_CACHE_DIR
+                or ~/.cache/tangle/resized
 
         Returns:
-            List of image paths (original or resized temporary files)
+            List of image paths (original or cached resized files)
 
         Raises:
-            ValueError: If images cannot be resized to fit within limit
+            ValueError: If images still exceed the limit at quality 15 and 10% scale
         """
         if not image_paths:
             return image_paths
 
-        # Calculate total size
-        total_size = 0
-        image_data = []
-        for path in image_paths:
-            p = Path(path)
-            with open(p, "rb") as f:
-                data = f.read()
-                image_data.append(data)
-                total_size += ImageUtils._estimate_base64_size(data)
+        # Calculate total size from file sizes alone; nothing is read or encoded
+        total_size = sum(ImageUtils._base64_size(Path(path).stat().st_size) for path in image_paths)
 
         # If within limit, return original paths
         if total_size <= MAX_TOTAL_IMAGE_PAYLOAD_BYTES:
@@ -206,42 +456,31 @@ class ImageUtils:
         # Need to resize - start with quality 85 and reduce if needed
         logger.warning(f"Total image payload {total_size / 1024 / 1024:.2f}MB exceeds limit. Auto-resizing...")
 
-        quality = 85
-        scale_factor = 1.0
-
-        while quality > 10 or scale_factor < 1.0:
-            resized_data = []
-            total_resized_size = 0
-
-            for i, path in enumerate(image_paths):
-                try:
-                    compressed = ImageUtils._resize_image_to_quality(path, quality, scale_factor)
-                    resized_data.append(compressed)
-                    total_resized_size += ImageUtils._estimate_base64_size(compressed)
-                except Exception as e:
-                    logger.error(f"Failed to resize {path} at quality {quality}, scale {scale_factor:.2f}: {e}")
-                    raise
-
-            if total_resized_size <= MAX_TOTAL_IMAGE_PAYLOAD_BYTES:
-                # Write resized images to temporary files
-                temp_paths = []
-                for i, data in enumerate(resized_data):
-                    temp_path = Path(image_paths[i]).parent / f".{Path(image_paths[i]).stem}_resized_{quality}_{int(scale_factor*100)}.jpg"
-                    with open(temp_path, "wb") as f:
-                        f.write(data)
-                    temp_paths.append(str(temp_path))
-                    logger.info(f"Resized {Path(image_paths[i]).name} to {temp_path.stat().st_size / 1024 / 1024:.2f}MB (quality {quality}, scale {scale_factor:.2f})")
-
-                return temp_paths
-
-            # Reduce quality first, then scale if quality hits minimum
-            if quality > 10:
-                quality -= 5
-            else:
-                scale_factor -= 0.1
+        cache_dir = _resized_cache_dir(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        digests = [_file_digest(path) for path in image_paths]
 
-        # If we get here, even at quality 10 and heavily scaled it's too large
-        raise ValueError(
-            f"Cannot resize images to fit within {MAX_TOTAL_IMAGE_PAYLOAD_MB}MB limit. "
-            f"Total size at minimum settings: {total_resized_size / 1024 / 1024:.2f}MB"
+        # Reduce quality first at full size, then scale down at the lowest quality
+        quality, (resized_paths, total_resized_size) = ImageUtils._bisect_settings(
+            _RESIZE_QUALITIES,
+            lambda quality: ImageUtils._compress_images(image_paths, digests, quality, 1.0, cache_dir),
         )
+        scale_factor = 1.0
+        if quality is None:
+            quality = _RESIZE_QUALITIES[-1]
+            scale_factor, (resized_paths, total_resized_size) = ImageUtils._bisect_settings(
+                _RESIZE_SCALES,
+                lambda scale: ImageUtils._compress_images(image_paths, digests, quality, scale, cache_dir),
+            )
+            if scale_factor is None:
+                raise ValueError(
+                    f"Cannot resize images to fit within {MAX_TOTAL_IMAGE_PAYLOAD_MB}MB limit. "
+                    f"Total size at minimum settings: {total_resized_size / 1024 / 1024:.2f}MB"
+                )
+
+        _prune_resized_cache(cache_dir, keep=resized_paths)
+
+        for original_path, resized_path in zip(image_paths, resized_paths):
+            logger.info(f"Resized {Path(original_path).name} to {resized_path.stat().st_size / 1024 / 1024:.2f}MB (quality {quality}, scale {scale_factor:.2f})")
+
+        return [str(path) for path in resized_paths]
@@ -1,13 +1,88 @@
 import os
+import re
 import argparse
 import base64
+import copy
+import functools
+import json
 from pathlib import Path
-from perplexity import Perplexity
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, get_args
 from config import ModelConfig, ModelInput, ModelOutput, SearchFilter
 from image_utils import ImageUtils
 
 
+def _perplexity_class() -> type:
+    """Return the Perplexity SDK client class, importing the SDK on first use.
+
+    The SDK dominates this module's import time. A module-level Perplexity
+    attribute (set here, or patched in by tests) takes precedence.
+    """
+    perplexity_class = globals().get("Perplexity")
+    if perplexity_class is None:
+        from perplexity import Perplexity
+        globals()["Perplexity"] = perplexity_class = Perplexity
+    return perplexity_class
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve perplx_client.Perplexity lazily through _perplexity_class()."""
+    if name == "Perplexity":
+        return _perplexity_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Matches a ```json (or bare ```) fenced block holding a JSON object
+_JSON_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Finds where an unfenced JSON object ends, so braces in surrounding prose are ignored
+_JSON_DECODER = json.JSONDecoder()
+
+
+@functools.lru_cache(maxsize=64)
+def _has_nested_models(response_model: type) -> bool:
+    """Return whether any field of a response model holds another BaseModel (cached per class).
+
+    model_construct() leaves such fields as raw dicts, so these models are always validated.
+    """
+    from pydantic import BaseModel
+
+    def holds_model(annotation: Any) -> bool:
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return True
+        return any(holds_model(arg) for arg in get_args(annotation))
+
+    return any(holds_model(field.annotation) for field in response_model.model_fields.values())
+
+
+@functools.lru_cache(maxsize=64)
+def _json_schema_cached(response_model: type) -> Dict[str, Any]:
+    """Generate a response model's JSON schema, cached per class.
+
+    The cached schema is shared and must not be mutated; see _response_format.
+    """
+    return response_model.model_json_schema()
+
+
+def _response_format(response_model: type) -> Dict[str, Any]:
+    """Build the structured-output response_format for a response model class.
+
+    The JSON schema only depends on the class, so it is generated once per class
+    and copied into a fresh dictionary for every request.
+
+    Args:
+        response_model: Pydantic BaseModel subclass describing the expected output
+
+    Returns:
+        response_format dictionary for the Perplexity API
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "schema": copy.deepcopy(_json_schema_cached(response_model))
+        }
+    }
+
+
 class PerplexityClient:
     """
     Client for interacting with the Perplexity API using the native SDK.
@@ -30,7 +105,7 @@ class PerplexityClient:
         if not api_key:
             raise ValueError("PERPLEXITY_API_KEY environment variable must be set")
 
-        self.client = Perplexity(api_key=api_key)
+        self.client = _perplexity_class()(api_key=api_key)
         self.config = config
 
     def _encode_pdf(self, pdf_path: str) -> str:
@@ -85,6 +160,31 @@ class PerplexityClient:
         messages.append({"role": "user", "content": user_content})
         return messages
 
+    @staticmethod
+    def _extract_json_payload(content: str) -> str:
+        """Strip markdown code fences or surrounding prose from a JSON response.
+
+        Args:
+            content: Raw response content from the model
+
+        Returns:
+            The JSON object text, or the original content if no object was found
+        """
+        match = _JSON_FENCE_RE.search(content)
+        if match is not None:
+            return match.group(1)
+
+        # Take the first {...} span that parses as a complete JSON value
+        start = content.find("{")
+        while start != -1:
+            try:
+                _, end = _JSON_DECODER.raw_decode(content, start)
+            except json.JSONDecodeError:
+                start = content.find("{", start + 1)
+            else:
+                return content[start:end]
+        return content
+
     def _build_api_params(self, model_input: ModelInput, config: ModelConfig, search_filter: Optional[SearchFilter] = None) -> Dict[str, Any]:
         """
         Build API parameters from ModelInput and ModelConfig.
@@ -137,12 +237,7 @@ class PerplexityClient:
 
         # Add structured output if response_model is provided
         if model_input.response_model is not None:
-            api_params["response_format"] = {
-                "type": "json_schema",
-                "json_schema": {
-                    "schema": model_input.response_model.model_json_schema()
-                }
-            }
+            api_params["response_format"] = _response_format(model_input.response_model)
 
         return api_params
 
@@ -181,32 +276,29 @@ class PerplexityClient:
         # Parse structured output if response_model was provided
         json_output = None
         if model_input.response_model is not None:
-            json_output = model_input.response_model.model_validate_json(content)
+            payload = self._extract_json_payload(content)
+            if model_input.response_model_trusted and not _has_nested_models(model_input.response_model):
+                # Schema already enforced by the API; skip Pydantic validation (flat models only)
+                json_output = model_input.response_model.model_construct(**json.loads(payload))
+            else:
+                json_output = model_input.response_model.model_validate_json(payload)
             text = None
         else:
             text = content
 
         # Extract search results if available
-        search_results = []
-        if hasattr(response, 'search_results') and response.search_results:
-            search_results = [
-                {
-                    "title": result.title,
-                    "url": result.url,
-                    "snippet": getattr(result, 'snippet', None)
-                }
-                for result in response.search_results
-            ]
-
-        # Extract related questions if available
-        related_questions = []
-        if hasattr(response, 'related_questions') and response.related_questions:
-            related_questions = response.related_questions
-
-        # Extract images if available
-        images = []
-        if hasattr(response, 'images') and response.images:
-            images = response.images
+        search_results = [
+            {
+                "title": result.title,
+                "url": result.url,
+                "snippet": getattr(result, 'snippet', None)
+            }
+            for result in getattr(response, 'search_results', None) or ()
+        ]
+
+        # Extract related questions and images if available
+        related_questions = getattr(response, 'related_questions', None) or ()
+        images = getattr(response, 'images', None) or ()
 
         # Extract optional usage metrics
         search_context_size = getattr(response.usage, 'search_context_size', None)
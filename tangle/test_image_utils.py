@@ -0,0 +1,290 @@
+"""Tests for the image_utils module."""
+
+import os
+import random
+from collections import OrderedDict
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+JpegImagePlugin = pytest.importorskip("PIL.JpegImagePlugin")
+
+import image_utils
+from image_utils import ImageUtils
+
+
+def make_image(path, size=(64, 64), seed=0):
+    """Write a noise image (noise keeps JPEG output large and quality-sensitive)."""
+    rng = random.Random(seed)
+    img = Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+    img.save(path, format="JPEG", quality=95)
+    return str(path)
+
+
+@pytest.fixture
+def encoded_cache(monkeypatch):
+    """Start each test with an empty encoded-image cache."""
+    monkeypatch.setattr(image_utils, "_encoded_cache", OrderedDict())
+    monkeypatch.setattr(image_utils, "_encoded_cache_bytes", 0)
+    return image_utils._encoded_cache
+
+
+class TestEncodedCache:
+    """Test the size-bounded cache behind encode_to_base64."""
+
+    def test_repeat_call_hits_cache(self, tmp_path, encoded_cache):
+        """Test that a second encode of an unchanged file returns the cached string."""
+        path = make_image(tmp_path / "a.jpg")
+
+        first = ImageUtils.encode_to_base64(path)
+        second = ImageUtils.encode_to_base64(path)
+
+        assert first.startswith("data:image/jpeg;base64,")
+        assert second is first
+        assert len(encoded_cache) == 1
+
+    def test_changed_file_is_reencoded(self, tmp_path, encoded_cache):
+        """Test that a new mtime or size produces a fresh encoding."""
+        path = make_image(tmp_path / "a.jpg", seed=1)
+        first = ImageUtils.encode_to_base64(path)
+
+        make_image(path, size=(96, 96), seed=2)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = ImageUtils.encode_to_base64(path)
+
+        assert second != first
+        assert len(encoded_cache) == 2
+
+    def test_evicts_least_recently_used(self, tmp_path, encoded_cache, monkeypatch):
+        """Test that entries are evicted oldest-first once the byte cap is passed."""
+        paths = [make_image(tmp_path / f"{i}.jpg", seed=i) for i in range(3)]
+        sizes = [len(ImageUtils.encode_to_base64(path)) for path in paths[:2]]
+        encoded_cache.clear()
+        monkeypatch.setattr(image_utils, "_encoded_cache_bytes", 0)
+        monkeypatch.setattr(image_utils, "MAX_ENCODED_CACHE_BYTES", sum(sizes) + 100)
+
+        ImageUtils.encode_to_base64(paths[0])
+        ImageUtils.encode_to_base64(paths[1])
+        ImageUtils.encode_to_base64(paths[0])  # Refresh paths[0] so paths[1] is oldest
+        ImageUtils.encode_to_base64(paths[2])
+
+        cached_paths = [key[0] for key in encoded_cache]
+        assert cached_paths == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]
+        assert image_utils._encoded_cache_bytes == sum(len(value) for value in encoded_cache.values())
+        assert image_utils._encoded_cache_bytes <= image_utils.MAX_ENCODED_CACHE_BYTES
+
+    def test_oversize_entry_not_cached(self, tmp_path, encoded_cache, monkeypatch):
+        """Test that a data URI larger than the cap is returned but not stored."""
+        monkeypatch.setattr(image_utils, "MAX_ENCODED_CACHE_BYTES", 1024)
+        path = make_image(tmp_path / "a.jpg", size=(128, 128))
+
+        encoded = ImageUtils.encode_to_base64(path)
+
+        assert len(encoded) > 1024
+        assert len(encoded_cache) == 0
+        assert image_utils._encoded_cache_bytes == 0
+
+
+class TestResizedCache:
+    """Test the on-disk cache of resized images."""
+
+    def test_miss_writes_cache_file(self, tmp_path):
+        """Test that a first compression writes one file per image into the cache directory."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        path = make_image(tmp_path / "a.jpg")
+
+        resized_paths, total_size = ImageUtils._compress_images([path], ["abc"], 50, 1.0, cache_dir)
+
+        assert resized_paths == [cache_dir / "abc_50_100.jpg"]
+        assert resized_paths[0].is_file()
+        assert total_size == ImageUtils._base64_size(resized_paths[0].stat().st_size)
+        assert not list(cache_dir.glob("*.tmp"))
+
+    def test_hit_skips_recompression(self, tmp_path, monkeypatch):
+        """Test that a cached result is reused and its mtime refreshed."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        path = make_image(tmp_path / "a.jpg")
+        cached, _ = ImageUtils._compress_images([path], ["abc"], 50, 1.0, cache_dir)
+        os.utime(cached[0], ns=(0, 0))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("cache hit should not recompress")
+
+        monkeypatch.setattr(ImageUtils, "_resize_image_to_quality", fail)
+        resized_paths, _ = ImageUtils._compress_images([path], ["abc"], 50, 1.0, cache_dir)
+
+        assert resized_paths == cached
+        assert cached[0].stat().st_mtime_ns > 0
+
+    def test_failed_write_removes_temp_file(self, tmp_path, monkeypatch):
+        """Test that the temporary file is deleted when the final rename fails."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        path = make_image(tmp_path / "a.jpg")
+
+        def fail_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(image_utils.os, "replace", fail_replace)
+        with pytest.raises(OSError, match="disk full"):
+            ImageUtils._compress_images([path], ["abc"], 50, 1.0, cache_dir)
+
+        assert list(cache_dir.iterdir()) == []
+
+    def test_prune_evicts_oldest_past_cap(self, tmp_path):
+        """Test that pruning deletes least recently used files but never those in keep."""
+        for age, name in enumerate(["new", "mid", "old", "kept"]):
+            entry = tmp_path / f"{name}.jpg"
+            entry.write_bytes(b"x" * 100)
+            os.utime(entry, ns=(0, (10 - age) * 1_000_000_000))
+        (tmp_path / "partial.tmp").write_bytes(b"x" * 1000)
+
+        image_utils._prune_resized_cache(tmp_path, keep=[tmp_path / "kept.jpg"], max_bytes=250)
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["kept.jpg", "new.jpg", "partial.tmp"]
+
+    def test_resize_uses_env_cache_dir(self, tmp_path, monkeypatch):
+        """Test that TANGLE_RESIZED_CACHE_DIR redirects resize_images_to_fit and clear_resized_cache."""
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv(image_utils.RESIZED_CACHE_DIR_ENV, str(cache_dir))
+        monkeypatch.setattr(image_utils, "MAX_TOTAL_IMAGE_PAYLOAD_BYTES", 4096)
+        paths = [make_image(tmp_path / f"{i}.jpg", seed=i) for i in range(2)]
+
+        resized = ImageUtils.resize_images_to_fit(paths)
+
+        assert [os.path.dirname(path) for path in resized] == [str(cache_dir)] * 2
+        cached = list(cache_dir.glob("*.jpg"))
+        assert len(cached) >= 2
+        assert ImageUtils.clear_resized_cache() == len(cached)
+        assert list(cache_dir.glob("*.jpg")) == []
+        assert ImageUtils.clear_resized_cache(tmp_path / "missing") == 0
+
+
+class TestBisectSettings:
+    """Test the bisection over quality settings used by resize_images_to_fit."""
+
+    @pytest.fixture
+    def compress(self, tmp_path):
+        """Return a counting compressor over two generated JPEGs at full scale."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        paths = [make_image(tmp_path / f"{i}.jpg", size=(96, 96), seed=i) for i in range(2)]
+        calls = []
+
+        def compress(quality):
+            calls.append(quality)
+            return ImageUtils._compress_images(paths, ["a", "b"], quality, 1.0, cache_dir)
+
+        compress.calls = calls
+        return compress
+
+    def test_picks_highest_quality_that_fits(self, compress, monkeypatch):
+        """Test that bisection returns the same quality as a linear scan, in fewer compressions."""
+        settings = image_utils._RESIZE_QUALITIES
+        sizes = {quality: compress(quality)[1] for quality in settings}
+        limit = sizes[50]
+        expected = next(quality for quality in settings if sizes[quality] <= limit)
+        compress.calls.clear()
+        monkeypatch.setattr(image_utils, "MAX_TOTAL_IMAGE_PAYLOAD_BYTES", limit)
+
+        quality, (paths, total_size) = ImageUtils._bisect_settings(settings, compress)
+
+        assert quality == expected
+        assert total_size == sizes[expected] <= limit
+        assert len(paths) == 2
+        assert len(compress.calls) < len(settings)
+
+    def test_nothing_fits(self, compress, monkeypatch):
+        """Test that only the last setting is tried when even it exceeds the limit."""
+        settings = image_utils._RESIZE_QUALITIES
+        monkeypatch.setattr(image_utils, "MAX_TOTAL_IMAGE_PAYLOAD_BYTES", 1)
+
+        quality, (paths, total_size) = ImageUtils._bisect_settings(settings, compress)
+
+        assert quality is None
+        assert compress.calls == [settings[-1]]
+        assert total_size > 1
+
+
+class TestCompressImages:
+    """Test parallel compression across several images."""
+
+    def test_output_order_matches_input(self, tmp_path):
+        """Test that each result lines up with its input even when workers finish out of order."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        sizes = [(160, 40), (32, 32), (120, 90), (48, 200), (64, 64)]
+        paths = [make_image(tmp_path / f"{i}.jpg", size=size, seed=i) for i, size in enumerate(sizes)]
+        digests = [f"img{i}" for i in range(len(paths))]
+
+        resized_paths, total_size = ImageUtils._compress_images(paths, digests, 60, 1.0, cache_dir)
+
+        assert [path.name for path in resized_paths] == [f"{digest}_60_100.jpg" for digest in digests]
+        for resized_path, size in zip(resized_paths, sizes):
+            with Image.open(resized_path) as img:
+                assert img.size == size
+        assert total_size == sum(ImageUtils._base64_size(path.stat().st_size) for path in resized_paths)
+
+    def test_worker_error_propagates(self, tmp_path):
+        """Test that a failure in one worker is raised to the caller."""
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        paths = [make_image(tmp_path / "good.jpg"), str(tmp_path / "bad.jpg")]
+        (tmp_path / "bad.jpg").write_bytes(b"not an image")
+
+        with pytest.raises(Image.UnidentifiedImageError):
+            ImageUtils._compress_images(paths, ["good", "bad"], 60, 1.0, cache_dir)
+
+        assert not list(cache_dir.glob("*.tmp"))
+
+
+class TestResizeImagesToFit:
+    """Test the quality-then-scale fallback of resize_images_to_fit."""
+
+    def test_scales_down_when_quality_alone_is_not_enough(self, tmp_path, monkeypatch):
+        """Test that images are shrunk once the lowest quality still exceeds the limit."""
+        path = make_image(tmp_path / "a.jpg", size=(256, 256))
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        lowest_quality = image_utils._RESIZE_QUALITIES[-1]
+        _, full_size = ImageUtils._compress_images([path], ["probe"], lowest_quality, 1.0, cache_dir)
+        monkeypatch.setattr(image_utils, "MAX_TOTAL_IMAGE_PAYLOAD_BYTES", full_size - 1)
+
+        (resized,) = ImageUtils.resize_images_to_fit([path], cache_dir=cache_dir)
+
+        assert resized.endswith(f"_{lowest_quality}_90.jpg")
+        with Image.open(resized) as img:
+            assert img.size == (230, 230)
+        assert ImageUtils._base64_size(os.path.getsize(resized)) < full_size
+
+    def test_raises_when_smallest_scale_does_not_fit(self, tmp_path, monkeypatch):
+        """Test that ValueError is raised when even 10% scale is too large."""
+        path = make_image(tmp_path / "a.jpg", size=(256, 256))
+        monkeypatch.setattr(image_utils, "MAX_TOTAL_IMAGE_PAYLOAD_BYTES", 100)
+
+        with pytest.raises(ValueError, match="Cannot resize images"):
+            ImageUtils.resize_images_to_fit([path], cache_dir=tmp_path / "cache")
+
+    def test_jpeg_downscale_uses_draft_decoding(self, tmp_path, monkeypatch):
+        """Test that JPEG sources are decoded with draft() when scaling down, and other formats are not."""
+        jpeg_path = make_image(tmp_path / "a.jpg", size=(256, 256))
+        png_path = tmp_path / "a.png"
+        with Image.open(jpeg_path) as img:
+            img.save(png_path)
+        requests = []
+        original_draft = JpegImagePlugin.JpegImageFile.draft
+
+        def spy(self, mode, size):
+            requests.append(size)
+            return original_draft(self, mode, size)
+
+        monkeypatch.setattr(JpegImagePlugin.JpegImageFile, "draft", spy)
+
+        ImageUtils._resize_image_to_quality(jpeg_path, 50, 0.3)
+        ImageUtils._resize_image_to_quality(jpeg_path, 50, 1.0)
+        ImageUtils._resize_image_to_quality(str(png_path), 50, 0.3)
+
+        assert requests == [(76, 76)]
@@ -2,8 +2,10 @@
 
 import os
 import base64
+import dataclasses
 import tempfile
 import pytest
+from typing import List
 from unittest.mock import Mock, patch, MagicMock
 from pydantic import BaseModel
 
@@ -17,6 +19,12 @@ class SampleModelResponse(BaseModel):
     confidence: float
 
 
+class NestedModelResponse(BaseModel):
+    """Sample response model with nested models for structured output testing."""
+    best: SampleModelResponse
+    alternatives: List[SampleModelResponse]
+
+
 class TestPerplexityClientInit:
     """Test PerplexityClient initialization."""
 
@@ -172,6 +180,58 @@ class TestPayloadMessages:
         assert messages[0]["role"] == "user"
 
 
+class TestExtractJsonPayload:
+    """Test JSON payload extraction from raw model responses."""
+
+    def test_plain_json_unchanged(self):
+        """Test that a bare JSON object is returned as-is."""
+        content = '{"answer": "42", "confidence": 0.9}'
+        assert PerplexityClient._extract_json_payload(content) == content
+
+    def test_json_code_fence_stripped(self):
+        """Test that a ```json fenced block is unwrapped."""
+        content = '```json\n{"answer": "42", "confidence": 0.9}\n```'
+        payload = PerplexityClient._extract_json_payload(content)
+        assert payload == '{"answer": "42", "confidence": 0.9}'
+
+    def test_bare_code_fence_stripped(self):
+        """Test that an unlabeled ``` fenced block is unwrapped."""
+        content = '```\n{"answer": "42", "confidence": 0.9}\n```'
+        payload = PerplexityClient._extract_json_payload(content)
+        assert payload == '{"answer": "42", "confidence": 0.9}'
+
+    def test_surrounding_prose_stripped(self):
+        """Test that prose around a JSON object is dropped."""
+        content = 'Here is the result: {"answer": "42", "confidence": 0.9} Hope it helps.'
+        payload = PerplexityClient._extract_json_payload(content)
+        assert payload == '{"answer": "42", "confidence": 0.9}'
+
+    def test_braces_in_surrounding_prose_ignored(self):
+        """Test that braces in the prose around a JSON object are not captured."""
+        content = 'Using {curly} notation: {"answer": "42", "confidence": 0.9} (see {ref}).'
+        payload = PerplexityClient._extract_json_payload(content)
+        assert payload == '{"answer": "42", "confidence": 0.9}'
+
+    def test_nested_object_in_prose(self):
+        """Test that an object with nested braces is extracted whole."""
+        content = 'Result: {"answer": {"value": "42"}, "confidence": 0.9} Done {here}.'
+        payload = PerplexityClient._extract_json_payload(content)
+        assert payload == '{"answer": {"value": "42"}, "confidence": 0.9}'
+
+    def test_no_json_returns_content(self):
+        """Test that content without a JSON object is returned unchanged."""
+        assert PerplexityClient._extract_json_payload("no json here") == "no json here"
+
+    def test_fenced_payload_validates(self):
+        """Test that the extracted payload parses into the response model."""
+        content = '```json\n{"answer": "42", "confidence": 0.9}\n```'
+        parsed = SampleModelResponse.model_validate_json(
+            PerplexityClient._extract_json_payload(content)
+        )
+        assert parsed.answer == "42"
+        assert parsed.confidence == 0.9
+
+
 class TestBuildApiParams:
     """Test API parameter building."""
 
@@ -251,6 +311,42 @@ class TestBuildApiParams:
         assert "json_schema" in params["response_format"]
         assert "schema" in params["response_format"]["json_schema"]
 
+    def test_build_api_params_response_format_reused(self):
+        """Test that the JSON schema is generated once per response model class."""
+        class CachedSchemaResponse(BaseModel):
+            value: str
+
+        model_input = ModelInput(
+            user_prompt="Test prompt",
+            response_model=CachedSchemaResponse
+        )
+        config = ModelConfig()
+
+        with patch.object(
+            CachedSchemaResponse, "model_json_schema",
+            wraps=CachedSchemaResponse.model_json_schema
+        ) as mock_schema:
+            first = self.client._build_api_params(model_input, config)
+            second = self.client._build_api_params(model_input, config)
+
+        assert mock_schema.call_count == 1
+        assert first["response_format"] == second["response_format"]
+        assert "value" in first["response_format"]["json_schema"]["schema"]["properties"]
+
+    def test_build_api_params_response_format_not_shared(self):
+        """Test that mutating one request's response_format does not leak into the next."""
+        model_input = ModelInput(
+            user_prompt="Test prompt",
+            response_model=SampleModelResponse
+        )
+        config = ModelConfig()
+
+        first = self.client._build_api_params(model_input, config)
+        first["response_format"]["json_schema"]["schema"]["properties"].clear()
+        second = self.client._build_api_params(model_input, config)
+
+        assert "answer" in second["response_format"]["json_schema"]["schema"]["properties"]
+
     def test_build_api_params_with_system_prompt(self):
         """Test that system prompt is included in messages."""
         model_input = ModelInput(
@@ -359,6 +455,61 @@ class TestGenerateContent:
                 assert call_args.kwargs["temperature"] == 0.7
 
 
+class TestStructuredOutputParsing:
+    """Test parsing of structured responses into the response model."""
+
+    def setup_method(self):
+        """Set up test client returning a structured response."""
+        with patch.dict(os.environ, {"PERPLEXITY_API_KEY": "test-key"}):
+            with patch("perplx_client.Perplexity") as mock_perplexity:
+                self.mock_client_instance = MagicMock()
+                mock_perplexity.return_value = self.mock_client_instance
+                self.client = PerplexityClient()
+
+        mock_response = MagicMock()
+        mock_response.model = "sonar"
+        mock_response.choices[0].finish_reason = "stop"
+        mock_response.choices[0].message.content = '{"answer": "42", "confidence": "0.9"}'
+        self.mock_client_instance.chat.completions.create.return_value = mock_response
+
+    @pytest.mark.parametrize("trusted,expected_confidence", [
+        (False, 0.9),
+        (True, "0.9"),
+    ], ids=["validated", "trusted"])
+    def test_response_model_trusted(self, trusted, expected_confidence):
+        """Test that trusted responses are constructed without validation or coercion."""
+        model_input = ModelInput(
+            user_prompt="Test",
+            response_model=SampleModelResponse,
+            response_model_trusted=trusted
+        )
+
+        output = self.client.generate_content(model_input, ModelConfig())
+
+        assert isinstance(output.json, SampleModelResponse)
+        assert output.json.answer == "42"
+        assert output.json.confidence == expected_confidence
+
+    def test_response_model_trusted_nested_is_validated(self):
+        """Test that trusted responses with nested models still get built submodels."""
+        self.mock_client_instance.chat.completions.create.return_value.choices[0].message.content = (
+            '{"best": {"answer": "42", "confidence": "0.9"},'
+            ' "alternatives": [{"answer": "41", "confidence": 0.1}]}'
+        )
+        model_input = ModelInput(
+            user_prompt="Test",
+            response_model=NestedModelResponse,
+            response_model_trusted=True
+        )
+
+        output = self.client.generate_content(model_input, ModelConfig())
+
+        assert isinstance(output.json.best, SampleModelResponse)
+        assert output.json.best.confidence == 0.9
+        assert isinstance(output.json.alternatives[0], SampleModelResponse)
+        assert output.json.alternatives[0].answer == "41"
+
+
 class TestModelConfigParameters:
     """Test ModelConfig parameters and their effects on API calls."""
 
@@ -609,6 +760,48 @@ class TestModelConfigParameters:
         assert params["frequency_penalty"] == 0.2
 
 
+class TestModelConfigValidation:
+    """Test ModelConfig range validation and immutability."""
+
+    def test_temperature_out_of_range(self):
+        """Test temperature outside [0.0, 2.0] raises ValueError."""
+        with pytest.raises(ValueError, match="temperature"):
+            ModelConfig(temperature=2.5)
+        with pytest.raises(ValueError, match="temperature"):
+            ModelConfig(temperature=-0.1)
+
+    def test_top_p_out_of_range(self):
+        """Test top_p outside [0.0, 1.0] raises ValueError."""
+        with pytest.raises(ValueError, match="top_p"):
+            ModelConfig(top_p=1.5)
+
+    def test_max_tokens_not_positive(self):
+        """Test non-positive max_tokens raises ValueError."""
+        with pytest.raises(ValueError, match="max_tokens"):
+            ModelConfig(max_tokens=0)
+
+    def test_top_k_negative(self):
+        """Test negative top_k raises ValueError."""
+        with pytest.raises(ValueError, match="top_k"):
+            ModelConfig(top_k=-1)
+
+    def test_config_is_frozen(self):
+        """Test that ModelConfig fields cannot be reassigned."""
+        config = ModelConfig()
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.model = "sonar-pro"
+
+    def test_replace_derives_new_config(self):
+        """Test dataclasses.replace produces a validated variant."""
+        base = ModelConfig(max_tokens=1024, temperature=0.7)
+        derived = dataclasses.replace(base, model="sonar-pro")
+        assert derived.model == "sonar-pro"
+        assert derived.max_tokens == 1024
+        assert base.model == "sonar"
+        with pytest.raises(ValueError):
+            dataclasses.replace(base, temperature=3.0)
+
+
 class TestSearchFilterParameters:
     """Test SearchFilter parameters and their effects."""
 
@@ -663,6 +856,34 @@ class TestSearchFilterParameters:
         params = filter.to_model_config()
         assert params["search_domain_filter"][0].startswith("-")
 
+    def test_blocked_domains_params_not_shared(self):
+        """Test that mutating one request's denylist does not affect later requests."""
+        from config import SearchFilter
+        filter = SearchFilter(blocked_domains=["reddit.com"])
+        filter.to_model_config()["search_domain_filter"].append("-injected.com")
+        assert filter.to_model_config()["search_domain_filter"] == ["-reddit.com"]
+
+    def test_blocked_domains_changes_picked_up(self):
+        """Test that the prefixed denylist follows changes to blocked_domains."""
+        from config import SearchFilter
+        filter = SearchFilter(blocked_domains=["reddit.com"])
+        filter.to_model_config()
+
+        filter.blocked_domains.append("pinterest.com")
+        assert filter.to_model_config()["search_domain_filter"] == ["-reddit.com", "-pinterest.com"]
+
+        filter.blocked_domains = ["facebook.com"]
+        assert filter.to_model_config()["search_domain_filter"] == ["-facebook.com"]
+
+    def test_blocked_image_domains_changes_picked_up(self):
+        """Test that the image denylist is fresh per call and follows blocked_image_domains."""
+        from config import ImageFilter
+        filter = ImageFilter(blocked_image_domains=["gettyimages.com"])
+        filter.to_model_config()["image_domain_filter"].clear()
+
+        filter.blocked_image_domains.append("pinterest.com")
+        assert filter.to_model_config()["image_domain_filter"] == ["-gettyimages.com", "-pinterest.com"]
+
     def test_allowed_and_blocked_domains_conflict(self):
         """Test that using both allowed and blocked domains raises error."""
         from config import SearchFilter
@@ -0,0 +1,189 @@
+"""Tests for the perplx module."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from perplx import ModelConfig, PerplexityModel
+
+
+class _FakeCompletions:
+    """Stand-in for client.chat.completions that records create() calls."""
+
+    def __init__(self, reply=None, error_for=None, delay_for=None):
+        self.reply = reply or (lambda params: f"reply to {params['messages'][-1]['content']}")
+        self.error_for = error_for
+        self.delay_for = delay_for or (lambda prompt: 0)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def create(self, **params):
+        # Snapshot the messages, since callers may keep appending to the list
+        params = {**params, "messages": [dict(m) for m in params["messages"]]}
+        with self._lock:
+            self.calls.append(params)
+        prompt = params["messages"][-1]["content"]
+        time.sleep(self.delay_for(prompt))
+        if prompt == self.error_for:
+            raise RuntimeError(f"API failed for {prompt}")
+        message = SimpleNamespace(content=self.reply(params))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+@pytest.fixture
+def fake_completions():
+    """Fake completions endpoint with default replies."""
+    return _FakeCompletions()
+
+
+@pytest.fixture
+def perplexity_model(fake_completions):
+    """PerplexityModel whose lazily created client is replaced by a fake."""
+    model = PerplexityModel(default_model="sonar-pro")
+    model.client = SimpleNamespace(chat=SimpleNamespace(completions=fake_completions))
+    return model
+
+
+class TestModelConfigCopyMerge:
+    """Test that copy() and merge() re-validate their result."""
+
+    def test_copy_preserves_values(self):
+        """Test that a copy has the same public values."""
+        config = ModelConfig(model="sonar", temperature=0.2, max_tokens=100)
+        copied = config.copy()
+
+        assert copied is not config
+        assert copied.to_dict() == config.to_dict()
+
+    def test_copy_rejects_value_changed_after_init(self):
+        """Test that copy() catches an invalid value assigned after construction."""
+        config = ModelConfig(model="sonar")
+        config.temperature = 5.0
+
+        with pytest.raises(ValueError, match="temperature"):
+            config.copy()
+
+    def test_merge_other_takes_precedence(self):
+        """Test that merge() prefers the other config's non-None values."""
+        base = ModelConfig(model="sonar", temperature=0.2)
+        other = ModelConfig(temperature=0.9, max_tokens=50)
+
+        merged = base.merge(other)
+
+        assert merged.model == "sonar"
+        assert merged.temperature == 0.9
+        assert merged.max_tokens == 50
+
+    def test_merge_rejects_value_changed_after_init(self):
+        """Test that merge() catches an invalid value assigned after construction."""
+        base = ModelConfig(model="sonar")
+        other = ModelConfig()
+        other.model = "not-a-model"
+
+        with pytest.raises(ValueError, match="model must be one of"):
+            base.merge(other)
+
+
+class TestGenerateTextBatch:
+    """Test the generate_text_batch method."""
+
+    def test_empty_batch(self, perplexity_model, fake_completions):
+        """Test that an empty batch makes no requests."""
+        assert perplexity_model.generate_text_batch([]) == []
+        assert fake_completions.calls == []
+
+    def test_results_in_input_order(self, perplexity_model, fake_completions):
+        """Test that results follow the input order even when later prompts finish first."""
+        prompts = [f"prompt {i}" for i in range(5)]
+        fake_completions.delay_for = lambda prompt: (5 - int(prompt.split()[-1])) * 0.01
+
+        results = perplexity_model.generate_text_batch(prompts, model="sonar")
+
+        assert results == [f"reply to {prompt}" for prompt in prompts]
+        assert len(fake_completions.calls) == 5
+        assert all(call["model"] == "sonar" for call in fake_completions.calls)
+
+    def test_exception_propagates(self, perplexity_model, fake_completions):
+        """Test that a failure for one prompt is raised to the caller."""
+        fake_completions.error_for = "bad prompt"
+
+        with pytest.raises(RuntimeError, match="API failed for bad prompt"):
+            perplexity_model.generate_text_batch(["good prompt", "bad prompt", "other prompt"])
+
+    def test_default_workers_bounded(self, perplexity_model, fake_completions):
+        """Test that a large batch does not open one request per prompt at once."""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def track(prompt):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.005)
+            with lock:
+                in_flight -= 1
+            return 0
+
+        fake_completions.delay_for = track
+
+        results = perplexity_model.generate_text_batch([f"prompt {i}" for i in range(40)])
+
+        assert len(results) == 40
+        assert peak <= 8
+
+
+class TestConversationSession:
+    """Test the ConversationSession returned by start_conversation."""
+
+    def test_ask_grows_history(self, perplexity_model, fake_completions):
+        """Test that each turn records the user prompt and the assistant reply."""
+        session = perplexity_model.start_conversation(system_prompt="Be brief.", model="sonar")
+
+        assert session.ask("First") == "reply to First"
+        assert session.ask("Second") == "reply to Second"
+
+        assert session.messages == [
+            {"role": "system", "content": "Be brief."},
+            {"role": "user", "content": "First"},
+            {"role": "assistant", "content": "reply to First"},
+            {"role": "user", "content": "Second"},
+            {"role": "assistant", "content": "reply to Second"},
+        ]
+        assert fake_completions.calls[-1]["messages"] == session.messages[:-1]
+
+    def test_ask_failure_restores_history(self, perplexity_model, fake_completions):
+        """Test that a failed turn leaves the history as it was before the turn."""
+        session = perplexity_model.start_conversation(model="sonar")
+        session.ask("First")
+        before = list(session.messages)
+        fake_completions.error_for = "Second"
+
+        with pytest.raises(RuntimeError, match="API failed for Second"):
+            session.ask("Second")
+
+        assert session.messages == before
+
+    @pytest.mark.parametrize("model,system_prompt", [
+        ("sonar", "Be brief."),
+        ("sonar-pro", None),
+        ("sonar-reasoning", "Show your work."),
+        ("sonar-reasoning", None),
+        ("sonar-deep-research", None),
+    ])
+    def test_ask_matches_chat_request(self, perplexity_model, fake_completions, model, system_prompt):
+        """Test that a session turn sends the same request as chat() with the same history."""
+        session = perplexity_model.start_conversation(system_prompt=system_prompt, model=model)
+        session.ask("First")
+        history = [message for message in session.messages if message["role"] != "system"]
+
+        session.ask("Second")
+        perplexity_model.chat("Second", model=model, system_prompt=system_prompt,
+                              conversation_history=history)
+
+        session_call, chat_call = fake_completions.calls[-2:]
+        assert session_call == chat_call
+        assert "temperature" in session_call